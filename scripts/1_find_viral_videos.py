@@ -5,41 +5,148 @@ Viral YouTube Shorts videolarını bulur
 
 import os
 import json
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
+import httplib2
 from googleapiclient.errors import HttpError
+from api_cache import cached_execute, cache_stats
+import asset_fetcher
+import candidate_store
+import scoring
+from youtube_client import build_youtube
 
 # Konfigürasyon
 API_KEY = os.getenv('YOUTUBE_API_KEY')
 OUTPUT_DIR = 'data/cache'
+SEARCH_MAX_PAGES = int(os.getenv('SEARCH_MAX_PAGES', '3'))  # Strateji başına takip edilecek sayfa
+DISCOVERY_WORKERS = int(os.getenv('DISCOVERY_WORKERS', '8'))  # Eşzamanlı API isteği sınırı
+HTTP_TIMEOUT = 30
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# API key kontrolü
-if not API_KEY:
-    print("❌ YOUTUBE_API_KEY environment variable bulunamadı!")
-    with open(f'{OUTPUT_DIR}/video_selected.txt', 'w') as f:
-        f.write('false')
-    exit(1)
+# YouTube API istemcisi (ilk kullanımda bir kez oluşturulur ve paylaşılır)
+_youtube = None
+_youtube_lock = threading.Lock()
 
-print(f"🔑 API Key bulundu: {API_KEY[:10]}...")
+def get_youtube_client():
+    """Paylaşılan YouTube Data API istemcisini döndür"""
+    global _youtube
+    with _youtube_lock:
+        if _youtube is None:
+            if not API_KEY:
+                raise ValueError("YOUTUBE_API_KEY environment variable bulunamadı")
+            _youtube = build_youtube(developerKey=API_KEY)
+            print("✅ YouTube API client başlatıldı")
+        return _youtube
 
-# YouTube API istemcisi
-try:
-    youtube = build('youtube', 'v3', developerKey=API_KEY, cache_discovery=False)
-    print("✅ YouTube API client başlatıldı")
-except Exception as e:
-    print(f"❌ Client başlatma hatası: {e}")
-    with open(f'{OUTPUT_DIR}/video_selected.txt', 'w') as f:
-        f.write('false')
-    exit(1)
+# httplib2.Http thread-safe değil: her thread kendi bağlantısını kullanır
+_thread_local = threading.local()
 
-def find_viral_shorts():
-    """Viral shorts'ları bulur - çoklu strateji ile"""
+def _thread_http():
+    """Thread'e özel HTTP bağlantısını döndür"""
+    http = getattr(_thread_local, 'http', None)
+    if http is None:
+        http = httplib2.Http(timeout=HTTP_TIMEOUT)
+        _thread_local.http = http
+    return http
+
+def search_strategy(idx, query_params):
+    """Tek bir arama stratejisini nextPageToken ile SEARCH_MAX_PAGES sayfaya kadar takip et"""
+    
+    video_ids = []
+    page_token = None
+    
+    for page in range(SEARCH_MAX_PAGES):
+        params = dict(query_params)
+        if page_token:
+            params['pageToken'] = page_token
+        
+        try:
+            request = get_youtube_client().search().list(**params)
+            search_response = cached_execute(request, 'search', params, http=_thread_http())
+        except HttpError as e:
+            print(f"   ✗ Strateji {idx} ({query_params.get('q', 'default')}) API hatası: {e}")
+            break
+        
+        video_ids.extend(
+            item['id']['videoId']
+            for item in search_response.get('items', [])
+            if 'videoId' in item.get('id', {})
+        )
+        
+        page_token = search_response.get('nextPageToken')
+        if not page_token:
+            break
+    
+    if video_ids:
+        print(f"   ✓ Strateji {idx} ({query_params.get('q', 'default')}): {len(video_ids)} video, {page + 1} sayfa")
+    else:
+        print(f"   ✗ Strateji {idx} ({query_params.get('q', 'default')}): Video bulunamadı")
+    
+    return video_ids
+
+def fetch_video_details(batch_ids):
+    """50'lik bir id batch'i için video detaylarını al"""
+    try:
+        params = {
+            'part': 'snippet,statistics,contentDetails',
+            'id': ','.join(batch_ids)
+        }
+        request = get_youtube_client().videos().list(**params)
+        videos_response = cached_execute(request, 'videos', params, http=_thread_http())
+        return videos_response.get('items', [])
+    except HttpError as e:
+        print(f"❌ Video detay hatası: {e}")
+        return []
+
+def parse_candidate(item):
+    """videos().list öğesini aday kaydına çevir (eksik alan varsa None)"""
+    try:
+        stats = item['statistics']
+        content = item['contentDetails']
+        
+        # Duration check - ISO 8601 format (PT1M = 1 minute)
+        duration = content.get('duration', '')
+        
+        view_count = int(stats.get('viewCount', 0))
+        like_count = int(stats.get('likeCount', 0))
+        comment_count = int(stats.get('commentCount', 0))
+        
+        # Engagement rate
+        engagement_rate = 0
+        if view_count > 0:
+            engagement_rate = ((like_count + comment_count) / view_count) * 100
+        
+        return {
+            'video_id': item['id'],
+            'title': item['snippet']['title'],
+            'description': item['snippet'].get('description', ''),
+            'channel_title': item['snippet']['channelTitle'],
+            'channel_id': item['snippet']['channelId'],
+            'published_at': item['snippet']['publishedAt'],
+            'view_count': view_count,
+            'like_count': like_count,
+            'comment_count': comment_count,
+            'engagement_rate': round(engagement_rate, 2),
+            'thumbnail': item['snippet']['thumbnails']['high']['url'],
+            'duration': duration,
+            'is_short': int(scoring.is_short_duration(duration))
+        }
+    
+    except (KeyError, ValueError, AttributeError):
+        return None
+
+def find_viral_candidates(top_n=1):
+    """Viral shorts adaylarını bulur ve en iyi top_n tanesini sıralı döndürür - çoklu strateji ile"""
     
     print("🔍 Viral videolar aranıyor...")
     
     # Strateji 1: Son 7 gün, shorts hashtag
-    published_after_week = (datetime.utcnow() - timedelta(days=7)).isoformat() + 'Z'
+    # Gün başına yuvarla: aynı gün içindeki tekrar çalıştırmalar aynı önbellek anahtarını kullanır
+    published_after_week = (datetime.utcnow() - timedelta(days=7)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ).isoformat() + 'Z'
     
     search_queries = [
         {
@@ -69,120 +176,78 @@ def find_viral_shorts():
         }
     ]
     
+    # Tüm stratejileri aynı anda çalıştır (her biri kendi sayfalarını takip eder)
     all_video_ids = []
     
-    for idx, query_params in enumerate(search_queries):
-        try:
-            print(f"\n🔎 Strateji {idx + 1}: {query_params.get('q', 'default')}...")
-            
-            search_response = youtube.search().list(**query_params).execute()
-            
-            video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
-            
-            if video_ids:
-                print(f"   ✓ {len(video_ids)} video bulundu")
-                all_video_ids.extend(video_ids)
-            else:
-                print(f"   ✗ Video bulunamadı")
-                
-        except HttpError as e:
-            print(f"   ✗ API hatası: {e}")
-            continue
+    with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+        results = executor.map(search_strategy, range(1, len(search_queries) + 1), search_queries)
+        for video_ids in results:
+            all_video_ids.extend(video_ids)
     
-    # Duplicate'leri kaldır
-    all_video_ids = list(set(all_video_ids))
+    # Duplicate'leri kaldır (sırayı koru)
+    all_video_ids = list(dict.fromkeys(all_video_ids))
     
     if not all_video_ids:
         print("\n❌ Hiçbir strateji ile video bulunamadı")
         print("💡 Öneri: API quota'nızı kontrol edin veya daha sonra tekrar deneyin")
-        with open(f'{OUTPUT_DIR}/video_selected.txt', 'w') as f:
-            f.write('false')
-        return None
+        return []
     
     print(f"\n📊 Toplam {len(all_video_ids)} benzersiz video bulundu")
-    print("📝 Video detayları alınıyor...")
-    
-    # Video detaylarını al (max 50 at a time)
-    videos = []
     
-    for i in range(0, len(all_video_ids), 50):
-        batch_ids = all_video_ids[i:i+50]
+    with closing(candidate_store.connect()) as conn:
+        # Sadece yeni veya bayat adayların detaylarını çek
+        refresh_ids = candidate_store.stale_ids(conn, all_video_ids)
+        print(f"📝 Video detayları alınıyor... ({len(refresh_ids)} yeni/bayat, "
+              f"{len(all_video_ids) - len(refresh_ids)} güncel)")
         
-        try:
-            videos_response = youtube.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=','.join(batch_ids)
-            ).execute()
-            
-            for item in videos_response.get('items', []):
-                try:
-                    stats = item['statistics']
-                    content = item['contentDetails']
-                    
-                    # Duration check - ISO 8601 format (PT1M = 1 minute)
-                    duration = content.get('duration', '')
-                    
-                    # Shorts: max 60 seconds
-                    # PT59S, PT1M gibi formatları kontrol et
-                    is_short = False
-                    if 'PT' in duration:
-                        # Basit kontrol: M veya H varsa short değil
-                        if 'H' not in duration:  # Saat yok
-                            if 'M' not in duration:  # Dakika yok = saniye only
-                                is_short = True
-                            elif duration.count('M') == 1:  # Tek M var
-                                # PT1M veya daha az mı?
-                                mins = int(duration.split('M')[0].replace('PT', ''))
-                                if mins <= 1:  # 1 dakika veya daha az
-                                    is_short = True
-                    
-                    if not is_short:
-                        continue  # Shorts değil, atla
-                    
-                    view_count = int(stats.get('viewCount', 0))
-                    like_count = int(stats.get('likeCount', 0))
-                    comment_count = int(stats.get('commentCount', 0))
-                    
-                    # Engagement rate
-                    engagement_rate = 0
-                    if view_count > 0:
-                        engagement_rate = ((like_count + comment_count) / view_count) * 100
-                    
-                    # Daha gevşek kriterler
-                    if view_count >= 50000 and engagement_rate >= 1.5:
-                        videos.append({
-                            'video_id': item['id'],
-                            'title': item['snippet']['title'],
-                            'description': item['snippet'].get('description', ''),
-                            'channel_title': item['snippet']['channelTitle'],
-                            'channel_id': item['snippet']['channelId'],
-                            'published_at': item['snippet']['publishedAt'],
-                            'view_count': view_count,
-                            'like_count': like_count,
-                            'comment_count': comment_count,
-                            'engagement_rate': round(engagement_rate, 2),
-                            'thumbnail': item['snippet']['thumbnails']['high']['url'],
-                            'duration': duration
-                        })
-                
-                except (KeyError, ValueError, AttributeError) as e:
-                    continue
-                    
-        except HttpError as e:
-            print(f"❌ Video detay hatası: {e}")
-            continue
+        # Video detaylarını al (max 50 at a time, batch'ler paralel)
+        batches = [refresh_ids[i:i+50] for i in range(0, len(refresh_ids), 50)]
+        items = []
+        
+        with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+            for batch_items in executor.map(fetch_video_details, batches):
+                items.extend(batch_items)
+        
+        print(f"   ✓ {len(items)} video detayı alındı ({len(batches)} batch)")
+        
+        api_stats = cache_stats()
+        print(f"   💾 API önbelleği: {api_stats['hit']} hit, {api_stats['revalidated']} ETag ile doğrulandı, {api_stats['miss']} miss")
+        
+        candidates = [c for c in (parse_candidate(item) for item in items) if c]
+        candidate_store.upsert_candidates(conn, candidates)
+        
+        # Eşikleri geçen, yüklenmemiş adaylar (indeksli sorgu)
+        eligible = candidate_store.unprocessed_candidates(
+            conn,
+            min_views=scoring.MIN_VIEW_COUNT,
+            min_engagement=scoring.MIN_ENGAGEMENT_RATE,
+            published_after=published_after_week
+        )
+    
+    # Vektörel puanlama: süre/eşik kontrolü + engagement/velocity, en iyi top_n aday
+    ranked = scoring.score_candidates(eligible, k=top_n)
     
-    if not videos:
+    if not ranked:
         print("\n❌ Shorts kriterlerine uyan video bulunamadı")
-        print("📊 Bulunan videolar: Shorts değil veya yeterli engagement yok")
+        print("📊 Bulunan videolar: Shorts değil, yeterli engagement yok veya zaten işlendi")
         print("💡 İpucu: Kriterleri daha da gevşetin (min 10K view)")
+    
+    return ranked
+
+def find_viral_shorts():
+    """Viral shorts'ları bulur ve en iyisini pipeline için kaydeder"""
+    
+    ranked = find_viral_candidates(top_n=1)
+    
+    if not ranked:
         with open(f'{OUTPUT_DIR}/video_selected.txt', 'w') as f:
             f.write('false')
         return None
     
-    # En yüksek engagement'a sahip videoyu seç
-    videos.sort(key=lambda x: (x['engagement_rate'], x['view_count']), reverse=True)
-    selected_video = videos[0]
+    selected_video = ranked[0]
+    
+    # Thumbnail'i arka planda indirmeye başla: render adımı ağı beklemez
+    asset_fetcher.prefetch_thumbnails([selected_video])
     
     print(f"\n✅ Viral shorts bulundu!")
     print(f"📹 Başlık: {selected_video['title']}")
@@ -190,6 +255,7 @@ def find_viral_shorts():
     print(f"❤️  Beğeni: {selected_video['like_count']:,}")
     print(f"💬 Yorum: {selected_video['comment_count']:,}")
     print(f"📊 Engagement: {selected_video['engagement_rate']}%")
+    print(f"🚀 Velocity: {selected_video['views_per_hour']:,} izlenme/saat")
     print(f"⏱️  Süre: {selected_video['duration']}")
     print(f"🔗 URL: https://youtube.com/watch?v={selected_video['video_id']}")
     
@@ -203,4 +269,21 @@ def find_viral_shorts():
     return selected_video
 
 if __name__ == '__main__':
+    # API key kontrolü
+    if not API_KEY:
+        print("❌ YOUTUBE_API_KEY environment variable bulunamadı!")
+        with open(f'{OUTPUT_DIR}/video_selected.txt', 'w') as f:
+            f.write('false')
+        exit(1)
+    
+    print(f"🔑 API Key bulundu: {API_KEY[:10]}...")
+    
+    try:
+        get_youtube_client()
+    except Exception as e:
+        print(f"❌ Client başlatma hatası: {e}")
+        with open(f'{OUTPUT_DIR}/video_selected.txt', 'w') as f:
+            f.write('false')
+        exit(1)
+    
     find_viral_shorts()
@@ -3,27 +3,44 @@
 Viral videoyu Google Gemini ile analiz eder
 """
 
-import os
 import json
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+import candidate_store
+import gemini_client
 
 # Konfigürasyon
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-genai.configure(api_key=GEMINI_API_KEY)
-
 CACHE_DIR = 'data/cache'
 
-def load_video_data():
+AI_MODEL = 'gemini-2.0-flash-exp'
+SCHEMA_VERSION = 'analysis-v1'  # Prompt/JSON şeması değişince artır (önbelleği geçersiz kılar)
+GENERATION_CONFIG = {
+    'temperature': 0.7,
+    'top_p': 0.95,
+    'top_k': 40,
+    'max_output_tokens': 2048,
+}
+
+# Beklenen JSON şeması (akış sırasında doğrulanır)
+ANALYSIS_SCHEMA = {
+    'fields': {
+        'viral_factors': 'object',
+        'main_hook': 'string',
+        'target_audience': 'string',
+        'virality_score': 'number',
+        'key_takeaway': 'string'
+    },
+    'required': ['viral_factors', 'main_hook', 'target_audience', 'virality_score', 'key_takeaway']
+}
+
+def load_video_data(cache_dir=CACHE_DIR):
     """Seçilen video verisini yükle"""
-    with open(f'{CACHE_DIR}/selected_video.json', 'r', encoding='utf-8') as f:
+    with open(f'{cache_dir}/selected_video.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def analyze_with_gemini(video_data):
-    """Video verilerini Gemini ile analiz et"""
+def build_analysis_prompt(video_data):
+    """Analiz prompt'unu oluştur"""
     
-    print("🧠 Video Gemini AI ile analiz ediliyor...")
-    
-    analysis_prompt = f"""
+    return f"""
 You are a YouTube viral content analysis expert. Analyze the following viral YouTube Shorts video.
 
 VIDEO INFORMATION:
@@ -63,57 +80,86 @@ Return in JSON format:
 
 RETURN ONLY JSON, no other text.
 """
+
+def request_analysis(video_data, limiter=None):
+    """Paylaşılan model istemcisiyle analizi al ve JSON olarak döndür"""
+    return gemini_client.generate_json(
+        AI_MODEL, GENERATION_CONFIG, build_analysis_prompt(video_data), SCHEMA_VERSION, limiter,
+        schema=ANALYSIS_SCHEMA
+    )
+
+def save_analysis(video_data, analysis, cache_dir=CACHE_DIR):
+    """Analizi kaydet ve adayı analyzed olarak işaretle"""
+    output = {
+        'video_data': video_data,
+        'analysis': analysis,
+        'analyzed_at': None,
+        'ai_model': AI_MODEL
+    }
+    
+    with open(f'{cache_dir}/analysis.json', 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    
+    candidate_store.mark_status(video_data['video_id'], 'analyzed')
+
+def analyze_with_gemini(video_data, cache_dir=CACHE_DIR):
+    """Video verilerini Gemini ile analiz et"""
+    
+    print("🧠 Video Gemini AI ile analiz ediliyor...")
     
     try:
-        # Gemini model
-        model = genai.GenerativeModel(
-            model_name='gemini-2.0-flash-exp',
-            generation_config={
-                'temperature': 0.7,
-                'top_p': 0.95,
-                'top_k': 40,
-                'max_output_tokens': 2048,
-            }
-        )
-        
-        response = model.generate_content(analysis_prompt)
-        
-        # JSON parse et
-        response_text = response.text.strip()
-        
-        # Markdown kod bloğu varsa temizle
-        if response_text.startswith('```json'):
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
-        elif response_text.startswith('```'):
-            response_text = response_text.replace('```', '').strip()
-        
-        analysis = json.loads(response_text)
+        analysis = request_analysis(video_data)
         
         print("✅ Gemini analizi tamamlandı")
         print(f"🎯 Ana Hook: {analysis['main_hook']}")
         print(f"📊 Virality Score: {analysis['virality_score']}/100")
         
         # Kaydet
-        output = {
-            'video_data': video_data,
-            'analysis': analysis,
-            'analyzed_at': None,
-            'ai_model': 'gemini-2.0-flash-exp'
-        }
-        
-        with open(f'{CACHE_DIR}/analysis.json', 'w', encoding='utf-8') as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
+        save_analysis(video_data, analysis, cache_dir)
         
         return analysis
         
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON parse hatası: {e}")
-        print(f"Response: {response_text[:200]}")
+    except json.JSONDecodeError:
         raise
     except Exception as e:
         print(f"❌ Gemini analiz hatası: {e}")
         raise
 
+def analyze_candidates(candidates, max_workers=None, limiter=None):
+    """
+    Aday listesini tek model istemcisi ve ortak hız sınırlayıcı ile
+    eşzamanlı analiz et. Bir adayın hatası diğerlerini durdurmaz.
+    Sonuçlar virality_score'a göre azalan sırada döner (başarısızlar sonda).
+    """
+    
+    max_workers = max_workers or gemini_client.GEMINI_CONCURRENCY
+    limiter = limiter or gemini_client.get_limiter()
+    
+    print(f"🧠 {len(candidates)} aday Gemini ile analiz ediliyor ({max_workers} eşzamanlı)...")
+    
+    def analyze_one(video_data):
+        try:
+            return {'video_data': video_data, 'analysis': request_analysis(video_data, limiter), 'error': None}
+        except Exception as e:
+            print(f"   ✗ {video_data['video_id']}: {e}")
+            return {'video_data': video_data, 'analysis': None, 'error': f'{type(e).__name__}: {e}'}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(analyze_one, candidates))
+    
+    def virality(result):
+        try:
+            return float(result['analysis']['virality_score'])
+        except (TypeError, KeyError, ValueError):
+            return float('-inf')
+    
+    results.sort(key=virality, reverse=True)
+    
+    succeeded = sum(1 for r in results if r['analysis'] is not None)
+    print(f"✅ {succeeded}/{len(results)} analiz tamamlandı")
+    
+    return results
+
 if __name__ == '__main__':
     video_data = load_video_data()
     analyze_with_gemini(video_data)
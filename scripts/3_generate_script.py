@@ -3,23 +3,50 @@
 Video için Google Gemini ile senaryo oluşturur
 """
 
-import os
 import json
-import google.generativeai as genai
+import gemini_client
 
 # Konfigürasyon
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-genai.configure(api_key=GEMINI_API_KEY)
-
 CACHE_DIR = 'data/cache'
 
-def load_analysis():
+AI_MODEL = 'gemini-2.0-flash-exp'
+SCHEMA_VERSION = 'script-v1'  # Prompt/JSON şeması değişince artır (önbelleği geçersiz kılar)
+GENERATION_CONFIG = {
+    'temperature': 0.8,
+    'top_p': 0.95,
+    'top_k': 40,
+    'max_output_tokens': 2048,
+}
+
+# Beklenen JSON şeması (akış sırasında doğrulanır, sahneler tamamlandıkça verilir)
+SCRIPT_SCHEMA = {
+    'fields': {
+        'title': 'string',
+        'hook': 'string',
+        'scenes': 'array',
+        'description': 'string',
+        'tags': 'array',
+        'word_count': 'number'
+    },
+    'required': ['title', 'hook', 'scenes', 'description', 'tags'],
+    'items': {
+        'scenes': {
+            'fields': {'timing': 'string', 'text': 'string', 'visual_note': 'string'},
+            'required': ['timing', 'text']
+        }
+    }
+}
+
+def load_analysis(cache_dir=CACHE_DIR):
     """Analiz sonuçlarını yükle"""
-    with open(f'{CACHE_DIR}/analysis.json', 'r', encoding='utf-8') as f:
+    with open(f'{cache_dir}/analysis.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def generate_script_with_gemini(analysis_data):
-    """Analiz sonuçlarına göre Gemini ile senaryo oluştur"""
+def generate_script_with_gemini(analysis_data, cache_dir=CACHE_DIR, on_scene=None):
+    """
+    Analiz sonuçlarına göre Gemini ile senaryo oluştur.
+    on_scene(index, scene) verilirse her sahne tamamlanır tamamlanmaz çağrılır.
+    """
     
     print("📝 Video senaryosu Gemini ile oluşturuluyor...")
     
@@ -80,29 +107,15 @@ RETURN ONLY JSON, no other text.
 """
     
     try:
-        # Gemini model
-        model = genai.GenerativeModel(
-            model_name='gemini-2.0-flash-exp',
-            generation_config={
-                'temperature': 0.8,
-                'top_p': 0.95,
-                'top_k': 40,
-                'max_output_tokens': 2048,
-            }
-        )
+        def handle_item(key, index, scene):
+            print(f"   🎬 Sahne {index + 1} hazır [{scene['timing']}s]")
+            if on_scene:
+                on_scene(index, scene)
         
-        response = model.generate_content(script_prompt)
-        
-        # JSON parse et
-        response_text = response.text.strip()
-        
-        # Markdown kod bloğu varsa temizle
-        if response_text.startswith('```json'):
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
-        elif response_text.startswith('```'):
-            response_text = response_text.replace('```', '').strip()
-        
-        script = json.loads(response_text)
+        script = gemini_client.generate_json(
+            AI_MODEL, GENERATION_CONFIG, script_prompt, SCHEMA_VERSION,
+            schema=SCRIPT_SCHEMA, on_item=handle_item
+        )
         
         # Kaynak belirtme kontrolü
         if 'source' not in script['description'].lower() and 'credit' not in script['description'].lower():
@@ -119,14 +132,12 @@ RETURN ONLY JSON, no other text.
             print(f"[{scene['timing']}s] {scene['text']}")
         
         # Kaydet
-        with open(f'{CACHE_DIR}/script.json', 'w', encoding='utf-8') as f:
+        with open(f'{cache_dir}/script.json', 'w', encoding='utf-8') as f:
             json.dump(script, f, ensure_ascii=False, indent=2)
         
         return script
         
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON parse hatası: {e}")
-        print(f"Response: {response_text[:200]}")
+    except json.JSONDecodeError:
         raise
     except Exception as e:
         print(f"❌ Senaryo oluşturma hatası: {e}")
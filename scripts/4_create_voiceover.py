@@ -1,22 +1,175 @@
 #!/usr/bin/env python3
 """
 Senaryo için TTS ile sesli anlatım oluşturur
+
+Her sahne ayrı ayrı ve paralel sentezlenir; parçalar yeniden encode
+edilmeden voiceover.mp3'te birleştirilir. Ölçülen gerçek süreler
+voiceover_timings.json'a yazılır ve video montajı bu süreleri kullanır.
+Her sahne ayrıca bir kez AAC'ye encode edilir; render adımı sesi yeniden
+encode etmeden (stream copy) ekler. Bellek içi modda sahneler, senaryo
+akışla üretilirken tamamlandıkça önceden sentezlenmeye başlar
+(prefetch_scene_pcm).
 """
 
 import os
 import json
+import time
+import queue
+import shutil
+import threading
+import importlib.util
+import audio_track
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
+from disk_cache import DiskLRUCache, content_key
+from ffmpeg_utils import concat_copy, probe_duration
 
 # Konfigürasyon
 CACHE_DIR = 'data/cache'
 AZURE_SPEECH_KEY = os.getenv('AZURE_SPEECH_KEY')
 AZURE_SPEECH_REGION = os.getenv('AZURE_SPEECH_REGION', 'westeurope')
+AZURE_VOICE = 'en-US-GuyNeural'
+PROSODY_RATE = '1.1'
+PROSODY_PITCH = '+5%'
+TTS_WORKERS = int(os.getenv('TTS_WORKERS', '6'))  # Eşzamanlı sahne sentezi
+
+# Bellek içi mod (run_pipeline): Azure ham PCM -> NumPy buffer -> renderer
+TTS_IN_MEMORY = os.getenv('TTS_IN_MEMORY', '1') == '1'
+PCM_FORMAT = 'Raw24Khz16BitMonoPcm'
+PCM_SAMPLE_RATE = 24000
+
+# Cümle seviyesinde ses önbelleği (çalıştırmalar ve sesler arası)
+TTS_CACHE_DIR = 'data/cache/tts'
+TTS_CACHE_MAX_MB = float(os.getenv('TTS_CACHE_MAX_MB', '128'))
+TTS_CACHE_ENABLED = os.getenv('TTS_CACHE_ENABLED', '1') == '1'
+
+audio_cache = DiskLRUCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 1024 * 1024)
 
-def load_script():
+def load_script(cache_dir=CACHE_DIR):
     """Senaryoyu yükle"""
-    with open(f'{CACHE_DIR}/script.json', 'r', encoding='utf-8') as f:
+    with open(f'{cache_dir}/script.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def create_voiceover_gtts(script):
+def normalize_text(text):
+    """Önbellek anahtarı için metni sadeleştir (fazla boşluklar sesi değiştirmez)"""
+    return ' '.join(text.split())
+
+def cached_synthesizer(synthesize, voice_params, stats):
+    """
+    synthesize(text, path) fonksiyonunu ses önbelleğiyle sar: anahtar
+    (normalize metin, motor, ses, prosody, format); sentez sadece ıskada çalışır
+    """
+    lock = threading.Lock()
+    
+    def wrapper(text, output_path):
+        key = content_key(normalize_text(text), voice_params)
+        suffix = os.path.splitext(output_path)[1]
+        
+        cached_path = audio_cache.get(key, suffix)
+        if cached_path:
+            try:
+                shutil.copyfile(cached_path, output_path)
+                with lock:
+                    stats['hits'] += 1
+                return probe_duration(output_path)
+            except FileNotFoundError:
+                pass  # Bu arada tahliye edildi: yeniden sentezle
+        
+        duration = synthesize(text, output_path)
+        audio_cache.put_file(key, output_path, suffix)
+        with lock:
+            stats['misses'] += 1
+        return duration
+    
+    return wrapper
+
+def synthesize_scenes(script, synthesize, cache_dir=CACHE_DIR, voice_params=None):
+    """Her sahneyi thread havuzunda ayrı dosyaya sentezle; (yollar, süreler) döndür"""
+    
+    texts = [scene['text'] for scene in script['scenes']]
+    segment_dir = f'{cache_dir}/voiceover_segments'
+    os.makedirs(segment_dir, exist_ok=True)
+    paths = [f'{segment_dir}/scene_{i:02d}.mp3' for i in range(len(texts))]
+    
+    stats = {'hits': 0, 'misses': 0}
+    if TTS_CACHE_ENABLED and voice_params:
+        synthesize = cached_synthesizer(synthesize, voice_params, stats)
+    
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, min(TTS_WORKERS, len(texts)))) as executor:
+        durations = list(executor.map(synthesize, texts, paths))
+    
+    print(f"🔊 {len(texts)} sahne paralel sentezlendi: {sum(durations):.1f}s ses, {time.time() - started:.1f}s sürede")
+    if stats['hits']:
+        print(f"💾 Ses önbelleği: {stats['hits']} isabet, {stats['misses']} yeni sentez")
+    return paths, durations
+
+def encode_scene_aac(encode, sources, aac_paths):
+    """Sahne seslerini paralel olarak AAC'ye encode et; başarısızsa None (render sesi kendisi encode eder)"""
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(TTS_WORKERS, len(aac_paths)))) as executor:
+            list(executor.map(encode, sources, aac_paths))
+    except Exception as e:
+        print(f"⚠️ AAC encode hatası: {e}")
+        return None
+    return aac_paths
+
+def save_voiceover(script, paths, durations, info, cache_dir=CACHE_DIR):
+    """Parçaları stream copy ile birleştir, zamanlama manifestini ve metadata'yı kaydet"""
+    
+    output_path = f'{cache_dir}/voiceover.mp3'
+    concat_copy(paths, output_path)
+    
+    aac_paths = encode_scene_aac(
+        lambda path, aac_path: audio_track.encode_aac(['-i', path], aac_path),
+        paths, [os.path.splitext(path)[0] + '.aac' for path in paths]
+    )
+    
+    total_duration = save_timings(script, paths, durations, info['method'], output_path, aac_paths, cache_dir)
+    
+    # Metadata kaydet
+    with open(f'{cache_dir}/voiceover_info.json', 'w') as f:
+        json.dump(dict(
+            info,
+            path=output_path,
+            text_length=sum(len(scene['text']) for scene in script['scenes']),
+            scene_count=len(paths),
+            duration=total_duration
+        ), f, indent=2)
+    
+    return output_path
+
+def save_timings(script, paths, durations, method, output_path=None, aac_paths=None, cache_dir=CACHE_DIR):
+    """
+    Zamanlama manifesti: her sahnenin gerçek süresi, ses dosyası ve ses
+    izindeki konumu. Render ve adım grafiği bu dosyayı okur. Toplam süreyi döndürür.
+    """
+    segments = []
+    position = 0.0
+    for index, (scene, path, duration) in enumerate(zip(script['scenes'], paths, durations)):
+        segments.append({
+            'index': index,
+            'text': scene['text'],
+            'path': path,
+            'duration': round(duration, 3),
+            'start': round(position, 3),
+            'end': round(position + duration, 3)
+        })
+        if aac_paths:
+            segments[-1]['aac_path'] = aac_paths[index]
+        position += duration
+    
+    with open(f'{cache_dir}/voiceover_timings.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'path': output_path,
+            'method': method,
+            'total_duration': round(position, 3),
+            'segments': segments
+        }, f, ensure_ascii=False, indent=2)
+    
+    return round(position, 3)
+
+def create_voiceover_gtts(script, cache_dir=CACHE_DIR):
     """Google TTS ile sesli anlatım (fallback)"""
     
     print("🎙️ Google TTS ile sesli anlatım oluşturuluyor...")
@@ -29,33 +182,41 @@ def create_voiceover_gtts(script):
         subprocess.check_call(['pip', 'install', 'gtts'])
         from gtts import gTTS
     
-    # Full script text
-    full_text = " ".join([scene['text'] for scene in script['scenes']])
-    
-    try:
+    def synthesize(text, output_path):
         # English TTS
-        tts = gTTS(text=full_text, lang='en', slow=False)
-        output_path = f'{CACHE_DIR}/voiceover.mp3'
+        tts = gTTS(text=text, lang='en', slow=False)
         tts.save(output_path)
+        return probe_duration(output_path)
+    
+    voice_params = {'engine': 'google_tts', 'voice': 'en', 'rate': 'normal', 'pitch': None, 'format': 'mp3'}
+    
+    try:
+        paths, durations = synthesize_scenes(script, synthesize, cache_dir, voice_params)
+        output_path = save_voiceover(script, paths, durations, {
+            'method': 'google_tts',
+            'language': 'en'
+        }, cache_dir)
         
         print(f"✅ Sesli anlatım kaydedildi: {output_path}")
-        
-        # Metadata kaydet
-        with open(f'{CACHE_DIR}/voiceover_info.json', 'w') as f:
-            json.dump({
-                'path': output_path,
-                'method': 'google_tts',
-                'language': 'en',
-                'text_length': len(full_text)
-            }, f, indent=2)
-        
         return output_path
-        
+    
     except Exception as e:
         print(f"❌ Google TTS hatası: {e}")
         raise
 
-def create_voiceover_azure(script):
+def build_ssml(text):
+    """Tek sahne için SSML"""
+    return f"""
+        <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
+            <voice name="{AZURE_VOICE}">
+                <prosody rate="{PROSODY_RATE}" pitch="{PROSODY_PITCH}">
+                    {escape(text)}
+                </prosody>
+            </voice>
+        </speak>
+        """
+
+def create_voiceover_azure(script, cache_dir=CACHE_DIR):
     """Azure Speech Service ile profesyonel İngilizce sesli anlatım"""
     
     print("🎙️ Azure TTS deneniyor...")
@@ -70,75 +231,246 @@ def create_voiceover_azure(script):
         print("⚠️ Azure key eksik, Google TTS kullanılacak")
         return None
     
-    # Full script text
-    full_text = " ".join([scene['text'] for scene in script['scenes']])
-    
     try:
-        # Azure Speech configuration
+        # Azure Speech configuration (tüm sahneler paylaşır)
         speech_config = speechsdk.SpeechConfig(
             subscription=AZURE_SPEECH_KEY,
             region=AZURE_SPEECH_REGION
         )
         
-        speech_config.speech_synthesis_voice_name = 'en-US-GuyNeural'
-        speech_config.set_speech_synthesis_output_format(
-            speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
-        )
-        
-        output_path = f'{CACHE_DIR}/voiceover.mp3'
-        audio_config = speechsdk.audio.AudioOutputConfig(filename=output_path)
-        
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config,
-            audio_config=audio_config
-        )
+        output_format = speechsdk.SpeechSynthesisOutputFormat.Audio16Khz32KBitRateMonoMp3
+        speech_config.speech_synthesis_voice_name = AZURE_VOICE
+        speech_config.set_speech_synthesis_output_format(output_format)
+        voice_params = {
+            'engine': 'azure_tts',
+            'voice': AZURE_VOICE,
+            'rate': PROSODY_RATE,
+            'pitch': PROSODY_PITCH,
+            'format': output_format.name
+        }
         
-        ssml_text = f"""
-        <speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="en-US">
-            <voice name="en-US-GuyNeural">
-                <prosody rate="1.1" pitch="+5%">
-                    {full_text}
-                </prosody>
-            </voice>
-        </speak>
-        """
-        
-        print(f"🔊 Sentezleniyor: {len(full_text)} karakter...")
-        result = synthesizer.speak_ssml_async(ssml_text).get()
-        
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            print(f"✅ Azure TTS başarılı: {output_path}")
-            
-            with open(f'{CACHE_DIR}/voiceover_info.json', 'w') as f:
-                json.dump({
-                    'path': output_path,
-                    'method': 'azure_tts',
-                    'voice': 'en-US-GuyNeural',
-                    'region': AZURE_SPEECH_REGION,
-                    'text_length': len(full_text)
-                }, f, indent=2)
+        def synthesize(text, output_path):
+            audio_config = speechsdk.audio.AudioOutputConfig(filename=output_path)
+            synthesizer = speechsdk.SpeechSynthesizer(
+                speech_config=speech_config,
+                audio_config=audio_config
+            )
+            result = synthesizer.speak_ssml_async(build_ssml(text)).get()
             
-            return output_path
-        else:
-            print(f"⚠️ Azure TTS başarısız, Google TTS'e geçiliyor")
-            return None
+            if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                details = getattr(result, 'cancellation_details', None)
+                raise RuntimeError(f"Azure sentezi başarısız: {getattr(details, 'error_details', result.reason)}")
             
+            del synthesizer  # Dosyanın kapanmasını garanti et
+            return result.audio_duration.total_seconds()
+        
+        print(f"🔊 Sentezleniyor: {len(script['scenes'])} sahne...")
+        paths, durations = synthesize_scenes(script, synthesize, cache_dir, voice_params)
+        output_path = save_voiceover(script, paths, durations, {
+            'method': 'azure_tts',
+            'voice': AZURE_VOICE,
+            'region': AZURE_SPEECH_REGION
+        }, cache_dir)
+        
+        print(f"✅ Azure TTS başarılı: {output_path}")
+        return output_path
+    
     except Exception as e:
         print(f"⚠️ Azure TTS hatası: {e}")
         print("📢 Google TTS'e geçiliyor...")
         return None
 
-def create_voiceover(script):
+_pcm_config = None
+_pcm_synthesizers = queue.SimpleQueue()  # Bağlantısı açık, yeniden kullanılabilir synthesizer'lar
+_pcm_prefetch = {}  # normalize metin -> Future (senaryo akışı sırasında başlatılan sentezler)
+_prefetch_executor = None
+_prefetch_lock = threading.Lock()
+
+PCM_VOICE_PARAMS = {
+    'engine': 'azure_tts',
+    'voice': AZURE_VOICE,
+    'rate': PROSODY_RATE,
+    'pitch': PROSODY_PITCH,
+    'format': PCM_FORMAT
+}
+
+def _new_pcm_synthesizer(speechsdk):
+    """Bellek içi (audio_config=None) synthesizer oluştur ve bağlantıyı önceden aç"""
+    global _pcm_config
+    if _pcm_config is None:
+        _pcm_config = speechsdk.SpeechConfig(subscription=AZURE_SPEECH_KEY, region=AZURE_SPEECH_REGION)
+        _pcm_config.speech_synthesis_voice_name = AZURE_VOICE
+        _pcm_config.set_speech_synthesis_output_format(getattr(speechsdk.SpeechSynthesisOutputFormat, PCM_FORMAT))
+    
+    synthesizer = speechsdk.SpeechSynthesizer(speech_config=_pcm_config, audio_config=None)
+    speechsdk.Connection.from_speech_synthesizer(synthesizer).open(True)
+    return synthesizer
+
+def prewarm_azure(count=TTS_WORKERS):
+    """Azure bağlantılarını senaryo üretilirken önceden aç (SDK/key yoksa sessizce geç)"""
+    if not (TTS_IN_MEMORY and AZURE_SPEECH_KEY):
+        return 0
+    try:
+        import azure.cognitiveservices.speech as speechsdk
+        for _ in range(max(0, count - _pcm_synthesizers.qsize())):
+            _pcm_synthesizers.put(_new_pcm_synthesizer(speechsdk))
+    except Exception as e:
+        print(f"⚠️ Azure ön bağlantı kurulamadı: {e}")
+        return 0
+    return _pcm_synthesizers.qsize()
+
+def synthesize_pcm(text):
+    """Tek sahnenin ham PCM'i: önce ses önbelleği, yoksa havuzdaki synthesizer ile Azure"""
+    import azure.cognitiveservices.speech as speechsdk
+    
+    key = content_key(normalize_text(text), PCM_VOICE_PARAMS)
+    cached_path = audio_cache.get(key, '.pcm') if TTS_CACHE_ENABLED else None
+    if cached_path:
+        try:
+            with open(cached_path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass  # Bu arada tahliye edildi: yeniden sentezle
+    
+    try:
+        synthesizer = _pcm_synthesizers.get_nowait()
+    except queue.Empty:
+        synthesizer = _new_pcm_synthesizer(speechsdk)
+    
+    result = synthesizer.speak_ssml_async(build_ssml(text)).get()
+    if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+        details = getattr(result, 'cancellation_details', None)
+        raise RuntimeError(f"Azure sentezi başarısız: {getattr(details, 'error_details', result.reason)}")
+    _pcm_synthesizers.put(synthesizer)  # Sadece sağlıklı synthesizer havuza döner
+    
+    if TTS_CACHE_ENABLED:
+        audio_cache.put_bytes(key, result.audio_data, '.pcm')
+    return result.audio_data
+
+def prefetch_scene_pcm(index, scene):
+    """
+    Senaryo adımının on_scene kancası: tamamlanan sahnenin sentezini arka
+    planda başlat; seslendirme adımı sonucu hazır bulur. Aynı metin (akış
+    yeniden denemesi) ikinci kez sentezlenmez.
+    """
+    global _prefetch_executor
+    if not (TTS_IN_MEMORY and AZURE_SPEECH_KEY):
+        return
+    
+    key = normalize_text(scene['text'])
+    with _prefetch_lock:
+        if key in _pcm_prefetch:
+            return
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=max(1, TTS_WORKERS), thread_name_prefix='tts-prefetch')
+        _pcm_prefetch[key] = _prefetch_executor.submit(synthesize_pcm, scene['text'])
+
+def take_prefetched_pcm(text):
+    """Önceden başlatılmış sentezin sonucu (yoksa veya başarısızsa None)"""
+    with _prefetch_lock:
+        future = _pcm_prefetch.pop(normalize_text(text), None)
+    if future is None:
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"⚠️ Önceden sentez başarısız, yeniden deneniyor: {e}")
+        return None
+
+def create_voiceover_azure_pcm(script, cache_dir=CACHE_DIR):
+    """
+    Azure'dan sahne başına ham PCM'i bellekte al (MP3 yok; render için
+    sahne başına tek AAC encode'u yazılır).
+    Dönüş: {'sample_rate', 'segments': [float32 (n, 1)], 'durations', 'aac_paths'} veya None
+    """
+    
+    print("🎙️ Azure TTS (bellek içi PCM) deneniyor...")
+    
+    try:
+        import numpy as np
+        # Sadece SDK kurulu mu kontrolü; sentez synthesize_pcm'de
+        if importlib.util.find_spec('azure.cognitiveservices.speech') is None:
+            raise ImportError('azure.cognitiveservices.speech')
+    except ImportError:
+        print("⚠️ Azure SDK yüklü değil, dosya tabanlı TTS kullanılacak")
+        return None
+    
+    def synthesize(text):
+        pcm = take_prefetched_pcm(text)
+        return pcm if pcm is not None else synthesize_pcm(text)
+    
+    try:
+        texts = [scene['text'] for scene in script['scenes']]
+        with _prefetch_lock:
+            prefetched = sum(1 for text in texts if normalize_text(text) in _pcm_prefetch)
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, min(TTS_WORKERS, len(texts)))) as executor:
+            pcm_chunks = list(executor.map(synthesize, texts))
+    except Exception as e:
+        print(f"⚠️ Azure PCM hatası: {e}")
+        return None
+    finally:
+        with _prefetch_lock:
+            _pcm_prefetch.clear()  # Senaryoya girmeyen (akışı kesilmiş) sahneler
+    
+    if prefetched:
+        print(f"⏩ {prefetched}/{len(texts)} sahnenin sentezi senaryo üretilirken başlamıştı")
+    
+    # 16-bit PCM -> [-1, 1] float32 (moviepy AudioArrayClip biçimi)
+    segments = [
+        (np.frombuffer(chunk, dtype='<i2').astype(np.float32) / 32768.0).reshape(-1, 1)
+        for chunk in pcm_chunks
+    ]
+    durations = [len(segment) / PCM_SAMPLE_RATE for segment in segments]
+    print(f"🔊 {len(texts)} sahne bellekte sentezlendi: {sum(durations):.1f}s ses, {time.time() - started:.1f}s sürede")
+    
+    segment_dir = f'{cache_dir}/voiceover_segments'
+    os.makedirs(segment_dir, exist_ok=True)
+    aac_paths = encode_scene_aac(
+        lambda chunk, aac_path: audio_track.encode_pcm(chunk, PCM_SAMPLE_RATE, aac_path),
+        pcm_chunks, [f'{segment_dir}/scene_{i:02d}.aac' for i in range(len(pcm_chunks))]
+    )
+    
+    # Zamanlama manifesti sahne AAC'lerini gösterir (MP3 yazılmaz): adım
+    # atlanırsa render sesi buradan alır. AAC yoksa eski manifest geçersiz
+    if aac_paths:
+        save_timings(script, aac_paths, durations, 'azure_tts_pcm', aac_paths=aac_paths, cache_dir=cache_dir)
+    elif os.path.exists(f'{cache_dir}/voiceover_timings.json'):
+        os.remove(f'{cache_dir}/voiceover_timings.json')
+    with open(f'{cache_dir}/voiceover_info.json', 'w') as f:
+        json.dump({
+            'method': 'azure_tts_pcm',
+            'voice': AZURE_VOICE,
+            'region': AZURE_SPEECH_REGION,
+            'sample_rate': PCM_SAMPLE_RATE,
+            'text_length': sum(len(text) for text in texts),
+            'scene_count': len(segments),
+            'duration': round(sum(durations), 3)
+        }, f, indent=2)
+    
+    return {'sample_rate': PCM_SAMPLE_RATE, 'segments': segments, 'durations': durations, 'aac_paths': aac_paths}
+
+def create_voiceover_in_memory(script, cache_dir=CACHE_DIR):
+    """Tek process modu: Azure PCM buffer'larını döndür; mümkün değilse dosyaya sentezle ve None döndür"""
+    if TTS_IN_MEMORY and AZURE_SPEECH_KEY:
+        voiceover = create_voiceover_azure_pcm(script, cache_dir)
+        if voiceover:
+            return voiceover
+    
+    create_voiceover(script, cache_dir)
+    return None
+
+def create_voiceover(script, cache_dir=CACHE_DIR):
     """Ana TTS fonksiyonu - önce Azure dene, sonra Google TTS"""
     
     # Önce Azure dene
     if AZURE_SPEECH_KEY:
-        result = create_voiceover_azure(script)
+        result = create_voiceover_azure(script, cache_dir)
         if result:
             return result
     
     # Azure başarısız olduysa veya key yoksa Google TTS kullan
-    return create_voiceover_gtts(script)
+    return create_voiceover_gtts(script, cache_dir)
 
 if __name__ == '__main__':
     script = load_script()
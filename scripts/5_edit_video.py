@@ -5,11 +5,15 @@ Final video montajını yapar
 
 import os
 import json
-import requests
-from moviepy.editor import *
-from moviepy.video.fx.all import crop
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
+import time
+import slides
+import asset_fetcher
+import candidate_store
+import encoder_profiles
+from ffmpeg_utils import FRAGMENTED_MP4
+
+# Not: moviepy, numpy ve PIL ağır modüller; kullanıldıkları
+# fonksiyonların içinde import edilir (moviepy.editor yerine sadece gereken sınıflar)
 
 # Konfigürasyon
 CACHE_DIR = 'data/cache'
@@ -17,73 +21,35 @@ OUTPUT_DIR = 'data/processed'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # Video özellikleri (YouTube Shorts)
-WIDTH = 1080
-HEIGHT = 1920
+WIDTH = slides.WIDTH
+HEIGHT = slides.HEIGHT
 FPS = 30
+RENDER_BACKEND = os.getenv('RENDER_BACKEND', 'moviepy')  # moviepy | ffmpeg
+
+# Önizleme: yarı çözünürlük, düşük fps, en hızlı encoder (aynı slayt yerleşimi)
+PREVIEW_WIDTH = WIDTH // 2
+PREVIEW_HEIGHT = HEIGHT // 2
+PREVIEW_FPS = int(os.getenv('PREVIEW_FPS', '15'))
+PREVIEW_PROFILE = 'draft'
+INTRO_DURATION = 3  # Zamanlama manifesti yoksa hook süresi
+THUMBNAIL_DURATION = 5  # Sessiz thumbnail arası
 
-def load_data():
+def load_data(cache_dir=CACHE_DIR):
     """Gerekli tüm verileri yükle"""
-    with open(f'{CACHE_DIR}/script.json', 'r', encoding='utf-8') as f:
+    with open(f'{cache_dir}/script.json', 'r', encoding='utf-8') as f:
         script = json.load(f)
-    with open(f'{CACHE_DIR}/selected_video.json', 'r', encoding='utf-8') as f:
+    with open(f'{cache_dir}/selected_video.json', 'r', encoding='utf-8') as f:
         video_data = json.load(f)
     return script, video_data
 
-def download_thumbnail(url, video_id):
-    """Orijinal videonun thumbnail'ini indir"""
-    print("🖼️ Thumbnail indiriliyor...")
-    
-    thumb_path = f'{CACHE_DIR}/thumb_{video_id}.jpg'
-    response = requests.get(url)
-    
-    with open(thumb_path, 'wb') as f:
-        f.write(response.content)
-    
-    return thumb_path
-
 def create_text_clip(text, duration, fontsize=60, color='white', bg_color='black'):
     """Metin klibi oluştur"""
     
-    # PIL ile metin görüntüsü oluştur
-    img = Image.new('RGB', (WIDTH, HEIGHT), color=bg_color)
-    draw = ImageDraw.Draw(img)
-    
-    # Font (default font kullan)
-    try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", fontsize)
-    except:
-        font = ImageFont.load_default()
-    
-    # Metni ortala
-    # Word wrap için basit implementasyon
-    words = text.split()
-    lines = []
-    current_line = []
-    
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        if bbox[2] - bbox[0] < WIDTH - 100:
-            current_line.append(word)
-        else:
-            if current_line:
-                lines.append(' '.join(current_line))
-            current_line = [word]
-    
-    if current_line:
-        lines.append(' '.join(current_line))
-    
-    # Metni çiz
-    y_offset = (HEIGHT - len(lines) * fontsize) // 2
-    for i, line in enumerate(lines):
-        bbox = draw.textbbox((0, 0), line, font=font)
-        text_width = bbox[2] - bbox[0]
-        x = (WIDTH - text_width) // 2
-        y = y_offset + i * (fontsize + 20)
-        
-        # Gölge efekti
-        draw.text((x+3, y+3), line, font=font, fill='black')
-        draw.text((x, y), line, font=font, fill=color)
+    import numpy as np
+    from moviepy.video.VideoClip import ImageClip
+    
+    # PIL ile metin görüntüsü oluştur (yerleşim: slides.py)
+    img = slides.text_image(text, fontsize=fontsize, color=color, bg_color=bg_color)
     
     # PIL image'i numpy array'e çevir
     img_array = np.array(img)
@@ -93,39 +59,51 @@ def create_text_clip(text, duration, fontsize=60, color='white', bg_color='black
     
     return clip
 
-def create_intro_clip(script):
+def load_voiceover_timings(cache_dir=CACHE_DIR):
+    """4. adımın yazdığı sahne zamanlama manifestini yükle (yoksa None)"""
+    path = f'{cache_dir}/voiceover_timings.json'
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def scene_durations(script, timings=None):
+    """
+    Sahne sürelerini döndür: manifest varsa ölçülen gerçek süreler,
+    yoksa LLM'in timing alanları (hook için INTRO_DURATION)
+    """
+    if timings:
+        return [segment['duration'] for segment in timings['segments']]
+    
+    durations = [INTRO_DURATION]
+    for scene in script['scenes'][1:]:
+        timing = scene['timing'].split('-')
+        durations.append(int(timing[1]) - int(timing[0]))
+    return durations
+
+def create_intro_clip(script, duration=INTRO_DURATION):
     """Giriş klibi oluştur (hook)"""
     print("🎬 Giriş klibi oluşturuluyor...")
     
     hook_text = script['hook']
-    return create_text_clip(hook_text, duration=3, fontsize=70, color='yellow', bg_color='#1a1a1a')
+    return create_text_clip(hook_text, duration=duration, fontsize=70, color='yellow', bg_color='#1a1a1a')
 
-def create_analysis_clips(script, thumbnail_path):
-    """Analiz kliplerini oluştur"""
+def create_analysis_clips(script, thumbnail_path, durations):
+    """Analiz kliplerini oluştur (durations: scenes[1:] için süreler)"""
     print("📊 Analiz klipleri oluşturuluyor...")
     
-    clips = []
-    
-    # Thumbnail'i ekle (orijinal videodan)
-    thumb = ImageClip(thumbnail_path).set_duration(5).resize((WIDTH, HEIGHT))
+    import numpy as np
+    from moviepy.video.VideoClip import ImageClip
     
-    # Overlay text: "Bu video neden viral oldu?"
-    overlay_text = create_text_clip(
-        "Bu video neden viral oldu?",
-        duration=5,
-        fontsize=80,
-        color='white',
-        bg_color=(0, 0, 0, 0)  # Transparent
-    ).set_position('center')
+    clips = []
     
-    thumbnail_with_text = CompositeVideoClip([thumb, overlay_text])
+    # Thumbnail (orijinal videodan) + "Bu video neden viral oldu?" katmanı:
+    # sabit yığın bir kez düzleştirilir, kare başına karıştırma yapılmaz
+    thumbnail_with_text = ImageClip(np.array(slides.thumbnail_image(thumbnail_path))).set_duration(THUMBNAIL_DURATION)
     clips.append(thumbnail_with_text)
     
     # Analiz sahne klipleri
-    for scene in script['scenes'][1:]:  # İlk sahne hook olduğu için atla
-        timing = scene['timing'].split('-')
-        duration = int(timing[1]) - int(timing[0])
-        
+    for scene, duration in zip(script['scenes'][1:], durations):  # İlk sahne hook olduğu için atla
         text_clip = create_text_clip(
             scene['text'],
             duration=duration,
@@ -137,7 +115,60 @@ def create_analysis_clips(script, thumbnail_path):
     
     return clips
 
-def add_background_music(video_clip):
+def segment_starts(durations):
+    """Her sahne sesinin video üzerindeki başlangıcı (hook, thumbnail arası, diğer sahneler)"""
+    starts = [0.0]
+    position = durations[0] + THUMBNAIL_DURATION
+    for duration in durations[1:]:
+        starts.append(position)
+        position += duration
+    return starts
+
+def voiceover_samples(voiceover, durations, total_duration):
+    """Bellekteki sahne PCM'lerini video zaman çizelgesine yerleştir: mono float32 (n, 1)"""
+    import numpy as np
+    
+    sample_rate = voiceover['sample_rate']
+    track = np.zeros((int(round(total_duration * sample_rate)), 1), dtype=np.float32)
+    for segment, start in zip(voiceover['segments'], segment_starts(durations)):
+        offset = int(round(start * sample_rate))
+        segment = segment[:max(0, len(track) - offset)]
+        track[offset:offset + len(segment)] = segment
+    return track
+
+def voiceover_track(voiceover, durations, total_duration):
+    """Bellekteki ses izini tek bir moviepy ses klibi yap"""
+    import numpy as np
+    from moviepy.audio.AudioClip import AudioArrayClip
+    
+    track = voiceover_samples(voiceover, durations, total_duration)
+    return AudioArrayClip(np.repeat(track, 2, axis=1), fps=voiceover['sample_rate'])
+
+def voiceover_aac(voiceover=None, timings=None):
+    """Seslendirme adımının sahne AAC'leri (hepsi mevcutsa); yoksa None"""
+    if voiceover:
+        paths = voiceover.get('aac_paths')
+    elif timings:
+        paths = [segment.get('aac_path') for segment in timings['segments']]
+    else:
+        return None
+    
+    if paths and all(path and os.path.exists(path) for path in paths):
+        return paths
+    return None
+
+def voiceover_audio_file(aac_paths, durations, total_duration, cache_dir=CACHE_DIR):
+    """Sahne AAC'lerinden zaman çizelgesi boyunca tek ses dosyası (stream copy, yeniden encode yok)"""
+    import audio_track
+    
+    list_path = f'{cache_dir}/audio.ffconcat'
+    audio_path = f'{cache_dir}/voiceover_track.aac'
+    audio_track.write_track_list(aac_paths, segment_starts(durations), total_duration, cache_dir, list_path)
+    audio_track.build_track(list_path, audio_path, total_duration)
+    os.remove(list_path)
+    return audio_path
+
+def add_background_music(video_clip, cache_dir=CACHE_DIR, timings=None, voiceover=None):
     """Arka plan müziği ekle (lisanslı müzik kullan!)"""
     print("🎵 Arka plan müziği ekleniyor...")
     
@@ -145,7 +176,26 @@ def add_background_music(video_clip):
     # Örnek: Epidemic Sound, Artlist, vb.
     
     # Şimdilik sadece voiceover kullanacağız
-    voiceover_path = f'{CACHE_DIR}/voiceover.mp3'
+    if voiceover:
+        # Bellek içi PCM: MP3 encode/decode ve disk okuması yok
+        audio = voiceover_track(voiceover, voiceover['durations'], video_clip.duration)
+        return video_clip.set_audio(audio)
+    
+    from moviepy.audio.io.AudioFileClip import AudioFileClip
+    
+    if timings:
+        # Sahne parçalarını kendi kliplerinin başına yerleştir: kırpma gerekmez
+        from moviepy.audio.AudioClip import CompositeAudioClip
+        
+        durations = [segment['duration'] for segment in timings['segments']]
+        segments = [
+            AudioFileClip(segment['path']).set_start(start)
+            for segment, start in zip(timings['segments'], segment_starts(durations))
+        ]
+        audio = CompositeAudioClip(segments).set_duration(video_clip.duration)
+        return video_clip.set_audio(audio)
+    
+    voiceover_path = f'{cache_dir}/voiceover.mp3'
     
     if os.path.exists(voiceover_path):
         audio = AudioFileClip(voiceover_path)
@@ -159,55 +209,199 @@ def add_background_music(video_clip):
     
     return video_clip
 
-def create_final_video(script, video_data):
-    """Final videoyu oluştur"""
-    print("🎥 Final video oluşturuluyor...")
-    
-    # Thumbnail indir
-    thumbnail_path = download_thumbnail(video_data['thumbnail'], video_data['video_id'])
+def video_metadata(script, video_data, output_path):
+    """Yükleme adımının kullandığı metadata"""
+    return {
+        'output_path': output_path,
+        'original_video_id': video_data['video_id'],
+        'title': script['title'],
+        'description': script['description']
+    }
+
+def render_with_moviepy(script, thumbnail_path, output_path, durations, cache_dir=CACHE_DIR, timings=None, voiceover=None, profile=None,
+                        aac_paths=None, fragmented=False):
+    """
+    moviepy motoru: klipleri kare kare birleştirip yaz (sabit kare hızı).
+    aac_paths verilirse ses hazır AAC izinden stream copy ile aynı geçişte
+    eklenir; fragmented: parçalı MP4 (encode sürerken yüklenebilir).
+    """
     
     # Intro
-    intro = create_intro_clip(script)
+    intro = create_intro_clip(script, durations[0])
     
     # Analiz klipleri
-    analysis_clips = create_analysis_clips(script, thumbnail_path)
+    analysis_clips = create_analysis_clips(script, thumbnail_path, durations[1:])
     
     # Tüm klipleri birleştir
+    from moviepy.video.compositing.concatenate import concatenate_videoclips
+    
     all_clips = [intro] + analysis_clips
     final_video = concatenate_videoclips(all_clips, method="compose")
     
-    # Ses ekle
-    final_video = add_background_music(final_video)
-    
-    # Çıktı dosyası
-    output_path = f"{OUTPUT_DIR}/final_video_{video_data['video_id']}.mp4"
+    # Ses ekle (hazır AAC yoksa moviepy sesi çözüp yeniden encode eder)
+    audio = True
+    if aac_paths:
+        import audio_track
+        audio = voiceover_audio_file(aac_paths, durations, final_video.duration, cache_dir)
+    else:
+        final_video = add_background_music(final_video, cache_dir, timings, voiceover)
     
     # Render
-    print("🎬 Video render ediliyor...")
+    profile = encoder_profiles.resolve(profile, durations, FPS, size=(WIDTH, HEIGHT))
+    preset, ffmpeg_params = encoder_profiles.moviepy_params(profile, FPS)
+    if aac_paths:
+        ffmpeg_params += audio_track.ADTS_TO_MP4  # moviepy hazır ses dosyasını -acodec copy ile ekler
+    if fragmented:
+        ffmpeg_params += FRAGMENTED_MP4
+    threads = os.cpu_count() or 1
+    print(f"🎬 Video render ediliyor... ({encoder_profiles.describe(profile)}, {threads} thread)")
+    started = time.time()
     final_video.write_videofile(
         output_path,
         fps=FPS,
         codec='libx264',
+        audio=audio,
         audio_codec='aac',
-        temp_audiofile=f'{CACHE_DIR}/temp-audio.m4a',
+        temp_audiofile=f'{cache_dir}/temp-audio.m4a',
         remove_temp=True,
-        preset='medium',
-        threads=4
+        preset=preset,
+        threads=threads,
+        ffmpeg_params=ffmpeg_params
+    )
+    elapsed = time.time() - started
+    print(f"🧩 Encode: {elapsed:.1f}s, {final_video.duration * FPS / elapsed:.1f} kare/sn")
+    
+    if aac_paths:
+        os.remove(audio)
+
+def render_with_ffmpeg(script, thumbnail_path, output_path, durations, cache_dir=CACHE_DIR, timings=None, voiceover=None,
+                       profile=None, aac_paths=None, fragmented=False, fps=FPS, size=(WIDTH, HEIGHT)):
+    """ffmpeg motoru: slaytları bir kez çiz, videoyu sahne segmentlerinden kur"""
+    import ffmpeg_render
+    
+    print(f"🎬 Video render ediliyor (ffmpeg, {size[0]}x{size[1]} @ {fps} fps)...")
+    timeline = slides.build_slides(script, thumbnail_path, durations, THUMBNAIL_DURATION, *size)
+    total_duration = sum(duration for _, duration in timeline)
+    
+    aac_segments = None
+    audio_segments = None
+    pcm = None
+    if aac_paths:
+        aac_segments = list(zip(aac_paths, segment_starts(durations)))
+    elif voiceover:
+        import numpy as np
+        track = voiceover_samples(voiceover, durations, total_duration)
+        pcm = ((np.clip(track, -1.0, 1.0) * 32767).astype('<i2').tobytes(), voiceover['sample_rate'])
+    elif timings:
+        paths = [segment['path'] for segment in timings['segments']]
+        audio_segments = list(zip(paths, segment_starts(durations)))
+    elif os.path.exists(f'{cache_dir}/voiceover.mp3'):
+        audio_segments = [(f'{cache_dir}/voiceover.mp3', 0.0)]
+    
+    ffmpeg_render.render_slides(
+        timeline, output_path, cache_dir,
+        fps=fps, audio_segments=audio_segments, pcm=pcm, profile=profile, aac_segments=aac_segments,
+        fragmented=fragmented
     )
+
+def render_video(script, thumbnail_path, output_path, cache_dir=CACHE_DIR, voiceover=None, backend=None, profile=None,
+                 preview=False, fragmented=False):
+    """
+    Zaman çizelgesini hazırla ve seçilen motorla render et
+    (voiceover: bellek içi PCM, varsa; profile: encoder profili adı;
+    preview: yarı çözünürlük, ffmpeg motoru ve draft profili;
+    fragmented: parçalı MP4, yazılırken yüklenebilir)
+    """
+    backend = backend or RENDER_BACKEND
+    fps = FPS
+    if preview:
+        backend, profile, fps = 'ffmpeg', PREVIEW_PROFILE, PREVIEW_FPS
+    
+    # Sahne süreleri: seslendirmeden ölçülen gerçek süreler (varsa)
+    timings = None if voiceover else load_voiceover_timings(cache_dir)
+    if timings and len(timings['segments']) != len(script['scenes']):
+        print("⚠️ Zamanlama manifesti senaryoyla uyuşmuyor, timing alanları kullanılacak")
+        timings = None
+    if timings:
+        print(f"⏱️ Ölçülen sahne süreleri kullanılıyor: {timings['total_duration']:.1f}s ses")
+    durations = voiceover['durations'] if voiceover else scene_durations(script, timings)
+    
+    # Kare sınırına yuvarla: segmentler ve ses aynı zaman çizelgesini paylaşır
+    durations = [max(1, round(duration * fps)) / fps for duration in durations]
+    
+    # Seslendirme adımının AAC'leri varsa ses stream copy ile eklenir
+    aac_paths = voiceover_aac(voiceover, timings)
+    
+    if preview:
+        render_with_ffmpeg(script, thumbnail_path, output_path, durations, cache_dir, timings, voiceover, profile,
+                           aac_paths, fps=fps, size=(PREVIEW_WIDTH, PREVIEW_HEIGHT))
+    elif backend == 'ffmpeg':
+        render_with_ffmpeg(script, thumbnail_path, output_path, durations, cache_dir, timings, voiceover, profile, aac_paths,
+                           fragmented)
+    elif backend == 'moviepy':
+        render_with_moviepy(script, thumbnail_path, output_path, durations, cache_dir, timings, voiceover, profile, aac_paths,
+                            fragmented)
+    else:
+        raise ValueError(f"Bilinmeyen render motoru: {backend}")
+    
+    return output_path
+
+def final_output_path(video_data, output_dir=OUTPUT_DIR):
+    return f"{output_dir}/final_video_{video_data['video_id']}.mp4"
+
+def create_final_video(script, video_data, cache_dir=CACHE_DIR, output_dir=OUTPUT_DIR, voiceover=None, backend=None, profile=None,
+                       fragmented=False):
+    """
+    Final videoyu oluştur (voiceover: 4. adımın bellek içi PCM buffer'ları,
+    varsa; fragmented: parçalı MP4, render sürerken yüklemek için)
+    """
+    print("🎥 Final video oluşturuluyor...")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Thumbnail indir
+    thumbnail_path = asset_fetcher.fetch_thumbnail(video_data['thumbnail'], video_data['video_id'])
+    
+    # Çıktı dosyası
+    output_path = final_output_path(video_data, output_dir)
+    
+    render_video(script, thumbnail_path, output_path, cache_dir, voiceover, backend, profile, fragmented=fragmented)
     
     print(f"✅ Video oluşturuldu: {output_path}")
     
     # Metadata kaydet
-    with open(f'{OUTPUT_DIR}/video_metadata.json', 'w', encoding='utf-8') as f:
-        json.dump({
-            'output_path': output_path,
-            'original_video_id': video_data['video_id'],
-            'title': script['title'],
-            'description': script['description']
-        }, f, ensure_ascii=False, indent=2)
+    with open(f'{output_dir}/video_metadata.json', 'w', encoding='utf-8') as f:
+        json.dump(video_metadata(script, video_data, output_path), f, ensure_ascii=False, indent=2)
+    
+    candidate_store.mark_status(video_data['video_id'], 'rendered')
     
     return output_path
 
+def create_preview(script, video_data, cache_dir=CACHE_DIR, output_dir=OUTPUT_DIR, voiceover=None):
+    """Yüklemeden önce göz atmak için hızlı, düşük çözünürlüklü önizleme"""
+    print("👀 Önizleme oluşturuluyor...")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    thumbnail_path = asset_fetcher.fetch_thumbnail(video_data['thumbnail'], video_data['video_id'])
+    output_path = f"{output_dir}/preview_{video_data['video_id']}.mp4"
+    
+    started = time.time()
+    render_video(script, thumbnail_path, output_path, cache_dir, voiceover, preview=True)
+    
+    print(f"✅ Önizleme hazır ({time.time() - started:.1f}s): {output_path}")
+    return output_path
+
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Final video montajı')
+    parser.add_argument('--backend', choices=['moviepy', 'ffmpeg'], default=RENDER_BACKEND, help='Render motoru')
+    parser.add_argument('--profile', choices=[*encoder_profiles.PROFILES, 'auto'],
+                        default=encoder_profiles.ENCODER_PROFILE, help='Encoder profili')
+    parser.add_argument('--preview', action='store_true', help=f'Sadece {PREVIEW_WIDTH}x{PREVIEW_HEIGHT} önizleme üret')
+    args = parser.parse_args()
+    
     script, video_data = load_data()
-    create_final_video(script, video_data)
+    if args.preview:
+        create_preview(script, video_data)
+    else:
+        create_final_video(script, video_data, backend=args.backend, profile=args.profile)
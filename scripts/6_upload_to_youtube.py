@@ -1,24 +1,26 @@
 #!/usr/bin/env python3
 """
 Videoyu YouTube'a yükler
+
+Yükleme parçalı ve kaldığı yerden devam edebilir (resumable_upload.py):
+yarıda kalan bir yükleme yeniden çalıştırıldığında baştan başlamaz.
 """
 
 import os
 import json
-import pickle
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+import candidate_store
+import resumable_upload
+from youtube_client import build_youtube
 
 # Konfigürasyon
 CACHE_DIR = 'data/cache'
 OUTPUT_DIR = 'data/processed'
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
-def get_authenticated_service():
-    """YouTube API'ye kimlik doğrulama"""
+def get_credentials():
+    """OAuth kimlik bilgileri (refresh token ile)"""
     
     credentials = None
     
@@ -50,20 +52,37 @@ def get_authenticated_service():
         print("- YOUTUBE_REFRESH_TOKEN")
         raise ValueError("OAuth credentials missing")
     
-    return build('youtube', 'v3', credentials=credentials)
+    return credentials
+
+def get_authenticated_service():
+    """YouTube API'ye kimlik doğrulama"""
+    return build_youtube(credentials=get_credentials())
 
-def load_video_metadata():
+def get_upload_session():
+    """
+    Yükleme için yetkilendirilmiş HTTP oturumu. YOUTUBE_UPLOAD_URL yerel bir
+    test sunucusunu gösteriyorsa OAuth gerekmez.
+    """
+    if resumable_upload.UPLOAD_URL != resumable_upload.DEFAULT_UPLOAD_URL and not os.getenv('YOUTUBE_REFRESH_TOKEN'):
+        print(f"🧪 Yükleme adresi: {resumable_upload.UPLOAD_URL} (kimlik doğrulama yok)")
+        return resumable_upload.new_session()
+    return resumable_upload.new_session(get_credentials())
+
+def load_video_metadata(output_dir=OUTPUT_DIR):
     """Video metadata'sını yükle"""
-    with open(f'{OUTPUT_DIR}/video_metadata.json', 'r', encoding='utf-8') as f:
+    with open(f'{output_dir}/video_metadata.json', 'r', encoding='utf-8') as f:
         return json.load(f)
-    
-def load_script():
+
+def load_script(cache_dir=CACHE_DIR):
     """Script bilgilerini yükle (tags için)"""
-    with open(f'{CACHE_DIR}/script.json', 'r', encoding='utf-8') as f:
+    with open(f'{cache_dir}/script.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def upload_video(youtube, video_path, metadata, script):
-    """Videoyu YouTube'a yükle"""
+def upload_video(session, video_path, metadata, script, output_dir=OUTPUT_DIR, done=None, abort=None):
+    """
+    Videoyu YouTube'a yükle (session: get_upload_session()). done verilirse
+    dosya hâlâ yazılıyordur: yazıldıkça gönderilir, done set edilince biter.
+    """
     
     print("📤 Video YouTube'a yükleniyor...")
     
@@ -86,29 +105,14 @@ def upload_video(youtube, video_path, metadata, script):
         }
     }
     
-    # Media upload
-    media = MediaFileUpload(
-        video_path,
-        chunksize=-1,
-        resumable=True,
-        mimetype='video/mp4'
-    )
-    
-    # Upload request
-    request = youtube.videos().insert(
-        part=','.join(body.keys()),
-        body=body,
-        media_body=media
-    )
-    
     print("⏳ Yükleme başlıyor...")
     
-    response = None
-    while response is None:
-        status, response = request.next_chunk()
-        if status:
-            progress = int(status.progress() * 100)
-            print(f"📊 Yüklendi: {progress}%")
+    if done is not None:
+        # Render ile örtüşen akış yüklemesi (parçalı MP4)
+        response = resumable_upload.upload_stream(session, video_path, body, done, abort, mimetype='video/mp4')
+    else:
+        # Parçalı resumable upload (oturum diske yazılır, çökmeden sonra devam eder)
+        response = resumable_upload.upload_file(session, video_path, body, mimetype='video/mp4')
     
     video_id = response['id']
     video_url = f"https://youtube.com/watch?v={video_id}"
@@ -125,14 +129,23 @@ def upload_video(youtube, video_path, metadata, script):
         'uploaded_at': response['snippet']['publishedAt']
     }
     
-    with open(f'{OUTPUT_DIR}/upload_result.json', 'w', encoding='utf-8') as f:
+    result_path = f'{output_dir}/upload_result.json'
+    with open(result_path, 'w', encoding='utf-8') as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
     
+    # Aday indeksinde yüklendi olarak işaretle (bir daha seçilmesin)
+    candidate_store.mark_status(
+        metadata['original_video_id'],
+        'uploaded',
+        uploaded_video_id=video_id,
+        upload_result_path=result_path
+    )
+    
     return result
 
 if __name__ == '__main__':
-    # YouTube servisini başlat
-    youtube = get_authenticated_service()
+    # Yükleme oturumunu başlat
+    session = get_upload_session()
     
     # Metadata yükle
     metadata = load_video_metadata()
@@ -146,7 +159,7 @@ if __name__ == '__main__':
         exit(1)
     
     # Yükle
-    result = upload_video(youtube, video_path, metadata, script)
+    result = upload_video(session, video_path, metadata, script)
     
     print("\n🎉 Tüm işlem tamamlandı!")
     print(f"📺 Yeni video: {result['url']}")
@@ -0,0 +1,116 @@
+"""
+YouTube Data API yanıtları için disk önbelleği (TTL + ETag doğrulama)
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from googleapiclient.errors import HttpError
+
+# Konfigürasyon
+CACHE_DIR = 'data/cache/api'
+
+# Endpoint başına TTL (saniye) - süre dolunca ETag ile koşullu istek atılır
+TTLS = {
+    'search': int(os.getenv('API_CACHE_TTL_SEARCH', str(6 * 3600))),
+    'videos': int(os.getenv('API_CACHE_TTL_VIDEOS', str(3600))),
+}
+DEFAULT_TTL = 3600
+
+# Virgülle ayrılmış, sırası önemsiz parametreler
+_LIST_PARAMS = ('part', 'id')
+
+_stats = {'hit': 0, 'revalidated': 0, 'miss': 0}
+_stats_lock = threading.Lock()
+
+def _count(kind):
+    with _stats_lock:
+        _stats[kind] += 1
+
+def cache_stats():
+    """Bu çalışmadaki hit / revalidated / miss sayılarını döndür"""
+    with _stats_lock:
+        return dict(_stats)
+
+def normalize_params(params):
+    """İstek parametrelerini anahtar üretimi için normalize et"""
+    normalized = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        value = str(value).strip()
+        if key in _LIST_PARAMS:
+            value = ','.join(sorted(v.strip() for v in value.split(',') if v.strip()))
+        normalized[key] = value
+    return sorted(normalized.items())
+
+def cache_key(endpoint, params):
+    """Endpoint + normalize parametrelerden önbellek anahtarı üret"""
+    payload = json.dumps([endpoint, normalize_params(params)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _entry_path(endpoint, key):
+    return os.path.join(CACHE_DIR, endpoint, f'{key}.json')
+
+def _read_entry(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_entry(path, entry):
+    """Atomik yaz: paralel thread'ler yarım dosya görmesin"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def cached_execute(request, endpoint, params, http=None):
+    """
+    googleapiclient isteğini önbellek üzerinden çalıştır.
+
+    TTL içindeyse ağa hiç çıkmaz. TTL dolmuşsa kayıtlı ETag ile
+    If-None-Match gönderilir; 304 gelirse önbellekteki yanıt tazelenip döner.
+    """
+    key = cache_key(endpoint, params)
+    path = _entry_path(endpoint, key)
+    ttl = TTLS.get(endpoint, DEFAULT_TTL)
+    entry = _read_entry(path)
+    now = time.time()
+
+    if entry and now - entry.get('fetched_at', 0) < ttl:
+        _count('hit')
+        return entry['response']
+
+    if entry and entry.get('etag'):
+        request.headers['If-None-Match'] = entry['etag']
+
+    try:
+        response = request.execute(http=http)
+    except HttpError as e:
+        if entry and e.resp.status == 304:
+            _count('revalidated')
+            entry['fetched_at'] = now
+            _write_entry(path, entry)
+            return entry['response']
+        raise
+
+    _count('miss')
+    _write_entry(path, {
+        'endpoint': endpoint,
+        'params': normalize_params(params),
+        'etag': response.get('etag'),
+        'fetched_at': now,
+        'response': response
+    })
+    return response
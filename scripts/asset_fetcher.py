@@ -0,0 +1,172 @@
+"""
+Görsel varlık indirici: orijinal videonun thumbnail'i.
+
+Tüm istekler bağlantı havuzlu, paylaşılan tek bir requests.Session
+üzerinden gider (bağlantı/okuma zaman aşımı, 429/5xx için geri çekilmeli
+yeniden deneme). Yanıt diske akış olarak yazılır (gövde bellekte
+tutulmaz) ve video_id ile data/cache/thumbnails altında saklanır; ETag /
+Last-Modified ile koşullu istek atılır, 304'te dosya yeniden indirilmez.
+`high` (hqdefault) alınamazsa `maxres` (maxresdefault) denenir.
+
+Keşif adımı seçilen adayların thumbnail'lerini arka planda önceden indirir
+(prefetch_thumbnails); render adımı dosyayı önbellekte bulur veya sürmekte
+olan indirmeyi bekler.
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Konfigürasyon
+THUMBNAIL_CACHE_DIR = 'data/cache/thumbnails'
+THUMBNAIL_TTL = int(os.getenv('THUMBNAIL_TTL', str(24 * 3600)))  # Bu süre içinde ağa hiç çıkılmaz
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 30
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))
+HTTP_POOL_SIZE = 8
+PREFETCH_WORKERS = 4
+CHUNK_SIZE = 64 * 1024
+YTIMG_BASE = 'https://i.ytimg.com/vi'
+
+_session = None
+_session_lock = threading.Lock()
+
+_prefetch_executor = None
+_pending = {}  # video_id -> Future
+_pending_lock = threading.Lock()
+
+def get_session():
+    """Paylaşılan, bağlantı havuzlu ve yeniden denemeli HTTP oturumu"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=('GET', 'HEAD'),
+                respect_retry_after_header=True
+            )
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+def _read_meta(path):
+    try:
+        with open(f'{path}.meta.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_meta(path, meta):
+    tmp_path = f'{path}.meta.json.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, f'{path}.meta.json')
+
+def fetch(url, path):
+    """
+    URL'yi koşullu GET ile path'e indir (akış olarak, geçici dosya üzerinden).
+    Dönüş: 'downloaded' veya 'not_modified'. HTTP hatasında requests istisnası.
+    """
+    meta = _read_meta(path) if os.path.exists(path) else {}
+    headers = {}
+    if meta.get('url') == url:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    with get_session().get(url, headers=headers, stream=True,
+                           timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)) as response:
+        if response.status_code == 304:
+            _write_meta(path, dict(meta, checked_at=time.time()))
+            return 'not_modified'
+        response.raise_for_status()
+
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+        os.replace(tmp_path, path)
+
+        _write_meta(path, {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'checked_at': time.time()
+        })
+    return 'downloaded'
+
+def thumbnail_urls(url, video_id):
+    """Denenecek adresler: keşifte gelen `high` adresi, sonra hqdefault ve maxresdefault"""
+    urls = [url, f'{YTIMG_BASE}/{video_id}/hqdefault.jpg', f'{YTIMG_BASE}/{video_id}/maxresdefault.jpg']
+    return list(dict.fromkeys(u for u in urls if u))
+
+def _fetch_thumbnail(url, video_id):
+    os.makedirs(THUMBNAIL_CACHE_DIR, exist_ok=True)
+    path = os.path.join(THUMBNAIL_CACHE_DIR, f'{video_id}.jpg')
+
+    # Taze önbellek: ağa çıkma
+    if os.path.exists(path) and time.time() - _read_meta(path).get('checked_at', 0) < THUMBNAIL_TTL:
+        return path
+
+    import requests
+
+    last_error = None
+    for candidate in thumbnail_urls(url, video_id):
+        try:
+            started = time.time()
+            status = fetch(candidate, path)
+            if status == 'not_modified':
+                print(f"💾 Thumbnail değişmemiş (304): {video_id}")
+            else:
+                size_kb = os.path.getsize(path) / 1024
+                print(f"🖼️ Thumbnail indirildi: {video_id} ({size_kb:.0f} KB, {time.time() - started:.1f}s)")
+            return path
+        except requests.RequestException as e:
+            last_error = e
+            print(f"⚠️ Thumbnail alınamadı ({candidate}): {e}")
+
+    if os.path.exists(path):
+        print("⚠️ Önbellekteki eski thumbnail kullanılacak")
+        return path
+    raise RuntimeError(f"Thumbnail indirilemedi: {video_id} ({last_error})")
+
+def fetch_thumbnail(url, video_id):
+    """
+    Thumbnail yolunu döndür: önceden indirme sürüyorsa onu bekle, değilse
+    önbellekten al veya indir
+    """
+    with _pending_lock:
+        future = _pending.get(video_id)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            pass  # Önceden indirme başarısız: burada yeniden dene
+
+    return _fetch_thumbnail(url, video_id)
+
+def prefetch_thumbnails(candidates):
+    """Adayların thumbnail'lerini arka planda indirmeye başla (beklemeden döner)"""
+    global _prefetch_executor
+
+    with _pending_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='prefetch')
+        for candidate in candidates:
+            video_id = candidate['video_id']
+            if video_id not in _pending:
+                _pending[video_id] = _prefetch_executor.submit(
+                    _fetch_thumbnail, candidate.get('thumbnail'), video_id
+                )
@@ -0,0 +1,124 @@
+"""
+AAC ses izi: sentezde bir kez encode, render'da stream copy.
+
+Her sahne sesi seslendirme adımında bir kez ADTS AAC'ye (scene_XX.aac)
+encode edilir. Render sırasında video zaman çizelgesi bu parçalar ve
+önceden encode edilmiş sessizlik parçalarından bir concat listesi olarak
+kurulur; ses çözülmez ve yeniden encode edilmez. Hizalama AAC kare
+(1024 örnek) çözünürlüğündedir: sahne başlangıçları en yakın AAC karesine
+yuvarlanır (encoder gecikmesi düşülerek) ve bir sonraki sahneye taşan
+kuyruk outpoint ile kesilir; kayma birikmez. Toplam süre çıktıda -t ile
+kırpılır.
+"""
+
+import os
+from ffmpeg_utils import run_ffmpeg
+
+SAMPLE_RATE = 44100  # moviepy write_videofile varsayılanı
+CHANNELS = 2
+BITRATE = '128k'
+FRAME_SAMPLES = 1024  # AAC-LC kare başına örnek
+PRIMING_FRAMES = 1  # ffmpeg aac encoder'ın başa eklediği gecikme (1024 örnek)
+SILENCE_SECONDS = 10  # Sessizlik parçası; daha uzun boşluklar birden çok parçayla doldurulur
+
+AAC_ARGS = ['-c:a', 'aac', '-b:a', BITRATE, '-ar', SAMPLE_RATE, '-ac', CHANNELS, '-f', 'adts']
+# ADTS -> MP4 (stream copy): parçalı MP4'te muxer bunu kendisi eklemez
+ADTS_TO_MP4 = ['-bsf:a', 'aac_adtstoasc']
+
+def encode_aac(input_args, output_path, input=None):
+    """Girdiyi ortak parametrelerle ADTS AAC'ye encode et (input: stdin bytes)"""
+    run_ffmpeg([*input_args, '-vn', *AAC_ARGS, output_path], input=input)
+    return output_path
+
+def encode_pcm(pcm, sample_rate, output_path):
+    """Bellekteki mono s16le PCM'i AAC'ye encode et"""
+    return encode_aac(['-f', 's16le', '-ar', sample_rate, '-ac', '1', '-i', 'pipe:0'], output_path, input=pcm)
+
+def frame_count(path):
+    """ADTS dosyasındaki AAC kare sayısı (başlıklardaki kare uzunluklarından)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    frames = 0
+    offset = 0
+    while offset + 7 <= len(data):
+        if data[offset] != 0xFF or data[offset + 1] & 0xF0 != 0xF0:
+            raise ValueError(f"Geçersiz ADTS başlığı: {path} @ {offset}")
+        length = ((data[offset + 3] & 0x03) << 11) | (data[offset + 4] << 3) | (data[offset + 5] >> 5)
+        if length < 7:
+            raise ValueError(f"Geçersiz ADTS kare uzunluğu: {path} @ {offset}")
+        offset += length
+        frames += 1
+    return frames
+
+def frames_to_seconds(frames):
+    return frames * FRAME_SAMPLES / SAMPLE_RATE
+
+def silence_path(cache_dir):
+    """Önceden encode edilmiş sessizlik parçası (yoksa bir kez üretilir)"""
+    path = f'{cache_dir}/silence_{SAMPLE_RATE}_{CHANNELS}ch.aac'
+    if not os.path.exists(path):
+        tmp_path = f'{path}.tmp'
+        layout = 'stereo' if CHANNELS == 2 else 'mono'
+        encode_aac(['-f', 'lavfi', '-i', f'anullsrc=r={SAMPLE_RATE}:cl={layout}', '-t', SILENCE_SECONDS], tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+def write_track_list(aac_paths, starts, total_duration, cache_dir, list_path):
+    """
+    Sahne AAC'lerini video üzerindeki başlangıçlarına (starts) yerleştiren
+    concat listesini yaz. Aradaki boşluklar sessizlik parçalarıyla doldurulur.
+    """
+    silence = silence_path(cache_dir)
+    silence_frames = frame_count(silence)
+    entries = []
+    position = 0  # AAC kare cinsinden
+
+    def add_silence(frames):
+        while frames > 0:
+            chunk = min(frames, silence_frames)
+            entries.append((silence, chunk, True))
+            frames -= chunk
+
+    # Sahne başlangıçları AAC karesi cinsinden (encoder gecikmesi düşülür)
+    targets = [max(0, round(start * SAMPLE_RATE / FRAME_SAMPLES) - PRIMING_FRAMES) for start in starts]
+    end = -(-int(round(total_duration * SAMPLE_RATE)) // FRAME_SAMPLES)
+
+    for index, (path, target) in enumerate(zip(aac_paths, targets)):
+        add_silence(target - position)
+        position = max(position, target)
+
+        # Sonraki sahnenin başlangıcını aşan kuyruk (dolgu) outpoint ile kesilir
+        limit = targets[index + 1] if index + 1 < len(targets) else end
+        available = frame_count(path)
+        frames = min(available, limit - position)
+        if frames > 0:
+            entries.append((path, frames, frames < available))
+            position += frames
+
+    # Son sahneden sonra video sonuna kadar sessizlik (fazlası -t ile kırpılır)
+    add_silence(end - position)
+
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write('ffconcat version 1.0\n')
+        for path, frames, partial in entries:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            seconds = frames_to_seconds(frames)
+            f.write(f"file '{escaped}'\nduration {seconds:.6f}\n")
+            if partial:
+                # Kare ortası: yuvarlama hatasıyla bir kare fazla/eksik alınmaz
+                f.write(f"outpoint {frames_to_seconds(frames - 0.5):.6f}\n")
+    return list_path
+
+def build_track(list_path, output_path, duration):
+    """Concat listesinden tek ADTS ses dosyası (stream copy, süre -t ile)"""
+    run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', '-t', f'{duration:.3f}', output_path])
+    return output_path
+
+def mux(video_args, list_path, output_path, duration, output_args=()):
+    """Video girdisine hazır AAC izini ekle: iki akış da stream copy, süre -t ile"""
+    run_ffmpeg([
+        *video_args, '-f', 'concat', '-safe', '0', '-i', list_path,
+        '-map', '0:v', '-map', '1:a', '-c', 'copy', *ADTS_TO_MP4, '-t', f'{duration:.3f}', *output_args, output_path
+    ])
+    return output_path
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Render motorlarını karşılaştırır: moviepy ve ffmpeg yollarının duvar saati
+süresi ve tepe bellek kullanımı (RSS). Ağ çağrısı yapılmaz; sentetik senaryo,
+thumbnail ve sahne sesleri geçici bir klasörde üretilir.
+
+Her ölçüm yeni bir process'te yapılır. Tepe RSS Python process'i ve
+alt process'ler (ffmpeg) için ayrı raporlanır. ffmpeg segment önbelleği
+varsayılan olarak kapalıdır (soğuk render); --warm ile önce bir kez
+doldurulur ve tek sahnesi değişmiş senaryo ölçülür.
+
+Kullanım: python scripts/bench_render.py [--scenes 8] [--scene-seconds 6] [--repeat 3] [--warm] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import importlib
+import statistics
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKENDS = ('moviepy', 'ffmpeg')
+
+def build_fixture(work_dir, scenes, scene_seconds):
+    """Sentetik senaryo + thumbnail + sahne sesleri ve zamanlama manifesti"""
+    from PIL import Image
+    from ffmpeg_utils import run_ffmpeg, probe_duration
+    narrator = importlib.import_module('4_create_voiceover')
+
+    script = {
+        'title': 'Render benchmark',
+        'description': 'Sentetik senaryo',
+        'hook': 'Why did this short get ten million views in a single day?',
+        'scenes': [
+            {'timing': f'{i * scene_seconds}-{(i + 1) * scene_seconds}',
+             'text': f'Scene {i}: the creator front-loads the payoff, keeps cuts tight and ends on a loop.'}
+            for i in range(scenes)
+        ]
+    }
+    with open(os.path.join(work_dir, 'script.json'), 'w', encoding='utf-8') as f:
+        json.dump(script, f)
+
+    Image.new('RGB', (480, 360), (200, 40, 40)).save(os.path.join(work_dir, 'thumb.jpg'))
+
+    segment_dir = os.path.join(work_dir, 'voiceover_segments')
+    os.makedirs(segment_dir, exist_ok=True)
+    paths = []
+    for i in range(scenes):
+        path = os.path.join(segment_dir, f'scene_{i:02d}.mp3')
+        run_ffmpeg(['-f', 'lavfi', '-i', f'sine=frequency={220 + 40 * i}:duration={scene_seconds}',
+                    '-ac', '1', '-ar', '24000', '-c:a', 'libmp3lame', '-b:a', '48k', path])
+        paths.append(path)
+    durations = [probe_duration(path) for path in paths]
+    narrator.save_voiceover(script, paths, durations, {'method': 'bench'}, work_dir)
+
+def worker(backend, work_dir, edit_scene=None):
+    """Alt process: tek render, JSON sonuç (edit_scene: metni değiştirilecek sahne)"""
+    import resource
+    editor = importlib.import_module('5_edit_video')
+
+    with open(os.path.join(work_dir, 'script.json'), 'r', encoding='utf-8') as f:
+        script = json.load(f)
+    if edit_scene is not None:
+        script['scenes'][edit_scene]['text'] += f' (edit {time.time()})'
+
+    output_path = os.path.join(work_dir, f'out_{backend}.mp4')
+    started = time.perf_counter()
+    editor.render_video(script, os.path.join(work_dir, 'thumb.jpg'), output_path, work_dir, backend=backend)
+    seconds = time.perf_counter() - started
+
+    # Linux'ta ru_maxrss KB cinsinden
+    print(json.dumps({
+        'render': seconds,
+        'rss_self_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rss_children_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        'size_mb': os.path.getsize(output_path) / (1024 * 1024)
+    }))
+
+def measure(backend, work_dir, cache=False, edit_scene=None):
+    """Tek ölçüm: interpreter başlangıcı dahil duvar saati + worker raporu"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = SCRIPTS_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env['SEGMENT_CACHE_ENABLED'] = '1' if cache else '0'
+
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', backend, '--work-dir', work_dir]
+    if edit_scene is not None:
+        cmd += ['--edit-scene', str(edit_scene)]
+
+    # cwd=work_dir: segment önbelleği (data/cache/segments) geçici klasörde kalır
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env, cwd=work_dir)
+    wall = time.perf_counter() - started
+
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ['?'])[-1]
+        return {'error': error}
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['wall'] = wall
+    return result
+
+def bench(scenes, scene_seconds, repeat, backends=BACKENDS, warm=False):
+    work_dir = tempfile.mkdtemp(prefix='bench_render_')
+    try:
+        build_fixture(work_dir, scenes, scene_seconds)
+        results = {}
+        for backend in backends:
+            if warm:
+                measure(backend, work_dir, cache=True)  # Önbelleği doldur (sonuç sayılmaz)
+                runs = [measure(backend, work_dir, cache=True, edit_scene=1) for _ in range(repeat)]
+            else:
+                runs = [measure(backend, work_dir) for _ in range(repeat)]
+            errors = [r['error'] for r in runs if 'error' in r]
+            if errors:
+                results[backend] = {'error': errors[0]}
+                continue
+            results[backend] = {
+                key: statistics.median(r[key] for r in runs)
+                for key in ('wall', 'render', 'rss_self_mb', 'rss_children_mb', 'size_mb')
+            }
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render motorlarını karşılaştır')
+    parser.add_argument('--scenes', type=int, default=8, help='Sahne sayısı')
+    parser.add_argument('--scene-seconds', type=float, default=6, help='Sahne başına ses süresi')
+    parser.add_argument('--repeat', type=int, default=3, help='Motor başına tekrar (medyan alınır)')
+    parser.add_argument('--backend', action='append', choices=BACKENDS, help='Sadece bu motor(lar)')
+    parser.add_argument('--warm', action='store_true', help='Dolu segment önbelleğiyle tek sahne düzenlemesini ölç')
+    parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yaz')
+    parser.add_argument('--worker', choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--edit-scene', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sys.path.insert(0, SCRIPTS_DIR)
+        worker(args.worker, args.work_dir, args.edit_scene)
+        sys.exit(0)
+
+    sys.path.insert(0, SCRIPTS_DIR)
+    results = bench(args.scenes, args.scene_seconds, args.repeat, args.backend or BACKENDS, args.warm)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        sys.exit(0)
+
+    print(f"{'Motor':<10} {'duvar':>8} {'render':>8} {'RSS py':>9} {'RSS ffmpeg':>11} {'boyut':>8}")
+    for backend, r in results.items():
+        if 'error' in r:
+            print(f"{backend:<10} ❌ {r['error']}")
+        else:
+            print(f"{backend:<10} {r['wall']:7.1f}s {r['render']:7.1f}s {r['rss_self_mb']:7.0f}MB "
+                  f"{r['rss_children_mb']:9.0f}MB {r['size_mb']:6.1f}MB")
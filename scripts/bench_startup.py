@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Her adım için başlangıç maliyetini ölçer: yeni bir interpreter'da modülü
+import edip ilk yararlı işi (istemci kurma, slayt çizme...) yapana kadar
+geçen süre. Ağ çağrısı yapılmaz; sahte anahtarlar kullanılır.
+
+Kullanım: python scripts/bench_startup.py [--repeat 5] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Adım -> (modül, ilk yararlı iş). `m` import edilen modüldür.
+STAGES = {
+    '1_find_viral_videos': "m.get_youtube_client()",
+    '2_analyze_video': "m.gemini_client.get_model(m.AI_MODEL, m.GENERATION_CONFIG)",
+    '3_generate_script': "m.gemini_client.get_model(m.AI_MODEL, m.GENERATION_CONFIG)",
+    '4_create_voiceover': "__import__('azure.cognitiveservices.speech' if m.AZURE_SPEECH_KEY else 'gtts')",
+    '5_edit_video': "m.create_text_clip('Startup benchmark', duration=1)",
+    '6_upload_to_youtube': (
+        "from google.auth.credentials import AnonymousCredentials; "
+        "m.resumable_upload.new_session(AnonymousCredentials())"
+    ),
+}
+
+# Alt process'te çalışan ölçüm kodu: import ve ilk iş ayrı ayrı ölçülür
+PROBE = """
+import time, json, importlib
+t0 = time.perf_counter()
+m = importlib.import_module({module!r})
+t1 = time.perf_counter()
+{work}
+t2 = time.perf_counter()
+print(json.dumps({{'import': t1 - t0, 'work': t2 - t1}}))
+"""
+
+def measure(module, work):
+    """Tek ölçüm: interpreter başlangıcı dahil toplam süre + import/iş kırılımı"""
+    env = dict(os.environ)
+    env.setdefault('YOUTUBE_API_KEY', 'bench-dummy-key')
+    env.setdefault('GEMINI_API_KEY', 'bench-dummy-key')
+    env['PYTHONPATH'] = SCRIPTS_DIR + os.pathsep + env.get('PYTHONPATH', '')
+
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, work=work)],
+        capture_output=True, text=True, env=env
+    )
+    total = time.perf_counter() - started
+
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ['?'])[-1]
+        return {'error': error}
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['total'] = total
+    return result
+
+def bench(repeat):
+    results = {}
+    for module, work in STAGES.items():
+        runs = [measure(module, work) for _ in range(repeat)]
+        errors = [r['error'] for r in runs if 'error' in r]
+        if errors:
+            results[module] = {'error': errors[0]}
+            continue
+        results[module] = {
+            key: statistics.median(r[key] for r in runs)
+            for key in ('import', 'work', 'total')
+        }
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Adım başına başlangıç süresini ölç')
+    parser.add_argument('--repeat', type=int, default=5, help='Adım başına tekrar (medyan alınır)')
+    parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yaz')
+    args = parser.parse_args()
+
+    results = bench(args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        sys.exit(0)
+
+    print(f"{'Adım':<22} {'import':>9} {'ilk iş':>9} {'toplam':>9}")
+    for module, r in results.items():
+        if 'error' in r:
+            print(f"{module:<22} ❌ {r['error']}")
+        else:
+            print(f"{module:<22} {r['import'] * 1000:8.0f}ms {r['work'] * 1000:8.0f}ms {r['total'] * 1000:8.0f}ms")
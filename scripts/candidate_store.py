@@ -0,0 +1,196 @@
+"""
+Görülen tüm aday videolar için SQLite indeksi.
+
+Her aday bir kez kaydedilir; istatistikler her yenilemede snapshot olarak
+saklanır ve pipeline durumu (analyzed / rendered / uploaded) burada izlenir.
+Sadece `uploaded` işlenmiş sayılır: analiz veya render'da kalmış bir aday,
+yarım kalan çalışmaya artık devam edilmeyecek kadar eskiyince
+(RESUME_MAX_HOURS) yeniden seçilebilir.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+from stage_graph import RESUME_MAX_HOURS
+
+# Konfigürasyon
+DB_PATH = os.getenv('CANDIDATE_DB_PATH', 'data/candidates.db')
+REFRESH_HOURS = float(os.getenv('CANDIDATE_REFRESH_HOURS', '6'))  # Bu süreden eski satırlar yeniden çekilir
+
+# Pipeline durumları (sıralı - durum geri gitmez)
+STATUSES = ('discovered', 'analyzed', 'rendered', 'uploaded')
+
+CANDIDATE_COLUMNS = (
+    'video_id', 'title', 'description', 'channel_title', 'channel_id',
+    'published_at', 'view_count', 'like_count', 'comment_count',
+    'engagement_rate', 'thumbnail', 'duration'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    video_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    channel_title TEXT,
+    channel_id TEXT,
+    published_at TEXT NOT NULL,
+    duration TEXT,
+    is_short INTEGER NOT NULL DEFAULT 0,
+    thumbnail TEXT,
+    view_count INTEGER NOT NULL DEFAULT 0,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    comment_count INTEGER NOT NULL DEFAULT 0,
+    engagement_rate REAL NOT NULL DEFAULT 0,
+    first_seen_at TEXT NOT NULL,
+    refreshed_at TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'discovered',
+    status_updated_at TEXT,
+    uploaded_video_id TEXT,
+    upload_result_path TEXT
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    video_id TEXT NOT NULL REFERENCES candidates(video_id),
+    captured_at TEXT NOT NULL,
+    view_count INTEGER NOT NULL,
+    like_count INTEGER NOT NULL,
+    comment_count INTEGER NOT NULL,
+    PRIMARY KEY (video_id, captured_at)
+);
+
+CREATE INDEX IF NOT EXISTS idx_candidates_rank
+    ON candidates (status, is_short, engagement_rate DESC, view_count DESC);
+CREATE INDEX IF NOT EXISTS idx_candidates_published
+    ON candidates (published_at);
+CREATE INDEX IF NOT EXISTS idx_candidates_refreshed
+    ON candidates (refreshed_at);
+"""
+
+def _utc_iso(dt):
+    """YouTube API ile aynı biçim: sözlük sırası = zaman sırası"""
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def connect(db_path=None):
+    """Veritabanına bağlan ve şemayı hazırla"""
+    db_path = db_path or DB_PATH
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')  # Paralel okuyucular yazarı beklemesin
+    conn.executescript(SCHEMA)
+    return conn
+
+def stale_ids(conn, video_ids, max_age_hours=None):
+    """Hiç görülmemiş veya max_age_hours'tan eski olan id'leri döndür (giriş sırasıyla)"""
+    if max_age_hours is None:
+        max_age_hours = REFRESH_HOURS
+    cutoff = _utc_iso(datetime.utcnow() - timedelta(hours=max_age_hours))
+
+    fresh = set()
+    # SQLite parametre sınırı için parça parça sorgula
+    for i in range(0, len(video_ids), 500):
+        chunk = video_ids[i:i+500]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(
+            f"SELECT video_id FROM candidates WHERE video_id IN ({placeholders}) AND refreshed_at >= ?",
+            (*chunk, cutoff)
+        )
+        fresh.update(row['video_id'] for row in rows)
+
+    return [video_id for video_id in video_ids if video_id not in fresh]
+
+def upsert_candidates(conn, candidates):
+    """Adayları ekle/güncelle ve her biri için istatistik snapshot'ı kaydet"""
+    now = _utc_iso(datetime.utcnow())
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO candidates (
+                video_id, title, description, channel_title, channel_id,
+                published_at, duration, is_short, thumbnail,
+                view_count, like_count, comment_count, engagement_rate,
+                first_seen_at, refreshed_at
+            ) VALUES (
+                :video_id, :title, :description, :channel_title, :channel_id,
+                :published_at, :duration, :is_short, :thumbnail,
+                :view_count, :like_count, :comment_count, :engagement_rate,
+                :now, :now
+            )
+            ON CONFLICT (video_id) DO UPDATE SET
+                title = excluded.title,
+                description = excluded.description,
+                duration = excluded.duration,
+                is_short = excluded.is_short,
+                thumbnail = excluded.thumbnail,
+                view_count = excluded.view_count,
+                like_count = excluded.like_count,
+                comment_count = excluded.comment_count,
+                engagement_rate = excluded.engagement_rate,
+                refreshed_at = excluded.refreshed_at
+        """, [dict(candidate, now=now) for candidate in candidates])
+
+        conn.executemany("""
+            INSERT OR REPLACE INTO snapshots (video_id, captured_at, view_count, like_count, comment_count)
+            VALUES (:video_id, :now, :view_count, :like_count, :comment_count)
+        """, [dict(candidate, now=now) for candidate in candidates])
+
+def unprocessed_candidates(conn, min_views, min_engagement, published_after=None, stalled_hours=None):
+    """
+    Eşikleri geçen, yüklenmemiş shorts adaylarını indeksli sorguyla yükle
+    (engagement sırasıyla). Analiz/render'da kalmış adaylar, durumları
+    stalled_hours'tan (varsayılan RESUME_MAX_HOURS) eskiyse döner; daha
+    yenileri devam edilebilecek bir çalışmaya aittir.
+    """
+    if stalled_hours is None:
+        stalled_hours = RESUME_MAX_HOURS
+    stalled_before = _utc_iso(datetime.utcnow() - timedelta(hours=stalled_hours))
+
+    query = f"""
+        SELECT {', '.join(CANDIDATE_COLUMNS)}
+        FROM candidates
+        WHERE (status = 'discovered'
+               OR (status IN ('analyzed', 'rendered') AND status_updated_at < ?))
+          AND is_short = 1
+          AND view_count >= ?
+          AND engagement_rate >= ?
+          AND published_at >= ?
+        ORDER BY engagement_rate DESC, view_count DESC
+    """
+    rows = conn.execute(query, (stalled_before, min_views, min_engagement, published_after or ''))
+    return [dict(row) for row in rows]
+
+def snapshot_history(conn, video_id):
+    """Bir videonun istatistik geçmişini zaman sırasıyla döndür"""
+    rows = conn.execute(
+        "SELECT captured_at, view_count, like_count, comment_count FROM snapshots "
+        "WHERE video_id = ? ORDER BY captured_at",
+        (video_id,)
+    )
+    return [dict(row) for row in rows]
+
+def mark_status(video_id, status, uploaded_video_id=None, upload_result_path=None, db_path=None):
+    """
+    Pipeline durumunu ilerlet (geri gitmez; aynı duruma tekrar gelmek zamanı
+    yeniler, ör. yeniden seçilip analiz edilen aday). Aday kayıtlı değilse
+    sessizce geçer.
+    """
+    if status not in STATUSES:
+        raise ValueError(f"Geçersiz durum: {status}")
+
+    if status == STATUSES[0]:
+        return
+    previous = STATUSES[:STATUSES.index(status) + 1]
+    placeholders = ','.join('?' * len(previous))
+
+    with closing(connect(db_path)) as conn, conn:
+        conn.execute(f"""
+            UPDATE candidates SET
+                status = ?,
+                status_updated_at = ?,
+                uploaded_video_id = COALESCE(?, uploaded_video_id),
+                upload_result_path = COALESCE(?, upload_result_path)
+            WHERE video_id = ? AND status IN ({placeholders})
+        """, (status, _utc_iso(datetime.utcnow()), uploaded_video_id, upload_result_path,
+              video_id, *previous))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Kısmi seçimin (scoring.score_candidates) tam sıralamayla aynı en iyi k
+adayı döndürdüğünü doğrular. Sentetik adaylarda birincil anahtar kaba
+yuvarlanır; böylece k. sınırda çok sayıda eşitlik oluşur ve sıranın
+izlenme sayısıyla belirlenmesi gerekir. Ağ çağrısı yapılmaz.
+
+Kullanım: python scripts/check_scoring.py [--candidates 500] [--rounds 50]
+"""
+
+import os
+import sys
+import random
+import argparse
+from datetime import datetime, timedelta
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import scoring
+
+NOW = datetime(2024, 1, 1)
+
+def make_candidates(count, rng):
+    """Engagement'ı %1'lik adımlarda olan (bolca eşitlik) Shorts adayları"""
+    candidates = []
+    for i in range(count):
+        views = rng.choice((100000, 200000, 400000)) + rng.randrange(0, 4) * 1000
+        engagement = rng.randrange(2, 6)
+        published = NOW - timedelta(hours=rng.choice((1, 2, 4, 8)))
+        candidates.append({
+            'video_id': f'v{i}',
+            'view_count': views,
+            'like_count': views * engagement // 100,
+            'comment_count': 0,
+            'duration': 'PT30S',
+            'published_at': published.strftime('%Y-%m-%dT%H:%M:%SZ')
+        })
+    return candidates
+
+def full_sort(candidates, k, rank_by):
+    """Referans: tüm adayları (birincil anahtar, izlenme) ile sırala"""
+    ranked = scoring.score_candidates(candidates, k=len(candidates), min_views=0, min_engagement=0,
+                                      rank_by=rank_by, now=NOW)
+    return [c['video_id'] for c in ranked[:k]]
+
+def check(count, rounds):
+    rng = random.Random(0)
+    for round_index in range(rounds):
+        candidates = make_candidates(count, rng)
+        k = rng.randrange(1, count)
+        for rank_by in ('engagement', 'velocity'):
+            expected = full_sort(candidates, k, rank_by)
+            actual = [c['video_id'] for c in scoring.score_candidates(
+                candidates, k=k, min_views=0, min_engagement=0, rank_by=rank_by, now=NOW
+            )]
+            if actual != expected:
+                raise AssertionError(f"{round_index}. tur, k={k}, {rank_by}: kısmi seçim tam sıralamadan farklı")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Kısmi seçimi sınır eşitliklerinde tam sıralamayla karşılaştır')
+    parser.add_argument('--candidates', type=int, default=500, help='Tur başına aday sayısı')
+    parser.add_argument('--rounds', type=int, default=50, help='Tur sayısı')
+    args = parser.parse_args()
+
+    check(args.candidates, args.rounds)
+    print(f"✅ {args.rounds} tur: kısmi seçim tam sıralamayla aynı")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Adım grafiğinin çalışma sınırlarını doğrular (stage_graph.py). Ağ çağrısı
+veya render yapılmaz; run_pipeline ile aynı adım adlarını taşıyan sentetik
+adımlar geçici bir klasörde çalıştırılır.
+
+Senaryolar:
+  - --no-upload → --no-upload → yükleme: her çalıştırma yeni video seçer,
+    yükleme adımı kendi çalışmasının videosunu yükler
+  - yükleme sürekli çökerse RESUME_MAX_ATTEMPTS denemeden sonra yeni
+    çalışma başlar
+  - kaynağı RESUME_MAX_HOURS saatten eski yarım çalışmaya devam edilmez
+  - günlük cron (zamanlayıcı kayması ±4 saat): ertesi gün yarım çalışmaya
+    her zaman bir kez devam edilir, iki gün sonra her zaman yeni çalışma
+
+Kullanım: python scripts/check_stage_graph.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import stage_graph
+from stage_graph import Stage, StageGraph
+
+class FakePipeline:
+    """find → script → render → upload; her video sırayla yeni bir kimlik alır"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.found = 0
+        self.ran = []
+        self.uploaded = []
+        self.fail_upload = False
+
+    def write(self, name, data):
+        with open(os.path.join(self.cache_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def read(self, name):
+        with open(os.path.join(self.cache_dir, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def find(self, ctx):
+        self.ran.append('find')
+        self.found += 1
+        video = {'video_id': f'v{self.found}'}
+        self.write('video.json', video)
+        return video
+
+    def script(self, ctx):
+        self.ran.append('script')
+        self.write('script.json', {'video_id': self.read('video.json')['video_id']})
+        return self.read('script.json')
+
+    def render(self, ctx):
+        self.ran.append('render')
+        self.write('final.json', self.read('script.json'))
+        return self.read('final.json')
+
+    def upload(self, ctx):
+        self.ran.append('upload')
+        if self.fail_upload:
+            raise RuntimeError('yükleme çöktü')
+        video_id = self.read('final.json')['video_id']
+        self.uploaded.append(video_id)
+        return video_id
+
+    def graph(self):
+        return StageGraph([
+            Stage('find', 'Bul', self.find, outputs=('{cache_dir}/video.json',),
+                  load=lambda ctx: self.read('video.json'), source=True),
+            Stage('script', 'Senaryo', self.script, inputs=('{cache_dir}/video.json',),
+                  outputs=('{cache_dir}/script.json',), load=lambda ctx: self.read('script.json')),
+            Stage('render', 'Render', self.render, inputs=('{cache_dir}/script.json',),
+                  outputs=('{cache_dir}/final.json',), load=lambda ctx: self.read('final.json')),
+            Stage('upload', 'Yükle', self.upload, inputs=('{cache_dir}/final.json',)),
+        ], self.cache_dir)
+
+    def run(self, target=None):
+        self.ran = []
+        try:
+            return self.graph().run({'cache_dir': self.cache_dir}, target=target)
+        except RuntimeError:
+            return None
+
+def expect(actual, expected, what):
+    if actual != expected:
+        raise AssertionError(f"{what}: {actual} != {expected}")
+
+def check_no_upload_sequence(cache_dir):
+    pipeline = FakePipeline(cache_dir)
+
+    pipeline.run(target='render')
+    expect(pipeline.ran, ['find', 'script', 'render'], '1. --no-upload')
+    pipeline.run(target='render')
+    expect(pipeline.ran, ['find', 'script', 'render'], '2. --no-upload (yeni video seçilmeli)')
+    ctx = pipeline.run()
+    expect(pipeline.ran, ['find', 'script', 'render', 'upload'], 'yükleme')
+    expect(pipeline.uploaded, ['v3'], 'yüklenen video')
+    expect(ctx['find']['video_id'], 'v3', 'yükleme çalışmasının videosu')
+
+def check_attempt_limit(cache_dir):
+    pipeline = FakePipeline(cache_dir)
+    pipeline.fail_upload = True
+
+    pipeline.run()
+    expect(pipeline.ran, ['find', 'script', 'render', 'upload'], 'ilk deneme')
+    for attempt in range(stage_graph.RESUME_MAX_ATTEMPTS):
+        pipeline.run()
+        expect(pipeline.ran, ['upload'], f'{attempt + 1}. devam denemesi')
+    pipeline.run()
+    expect(pipeline.ran, ['find', 'script', 'render', 'upload'], 'denemeler bitince yeni çalışma')
+    expect(pipeline.found, 2, 'seçilen video sayısı')
+
+def age_source(cache_dir, hours):
+    """Kaynak adımı `hours` saat önce bitmiş gibi göster"""
+    manifest_path = os.path.join(cache_dir, stage_graph.MANIFEST_NAME)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    old = datetime.now(timezone.utc) - timedelta(hours=hours)
+    manifest['stages']['find']['finished_at'] = old.isoformat()
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+def check_stale_source(cache_dir):
+    pipeline = FakePipeline(cache_dir)
+    pipeline.fail_upload = True
+    pipeline.run()
+    age_source(cache_dir, stage_graph.RESUME_MAX_HOURS + 1)
+
+    pipeline.fail_upload = False
+    pipeline.run()
+    expect(pipeline.ran, ['find', 'script', 'render', 'upload'], 'eski kaynak')
+    expect(pipeline.uploaded, ['v2'], 'yüklenen video')
+
+def check_daily_schedule(cache_dir):
+    for drift in (-4, 0, 4):
+        # Ertesi günün çalışması: yarım çalışmaya devam (yükleme tekrar çöker)
+        pipeline = FakePipeline(cache_dir)
+        pipeline.fail_upload = True
+        pipeline.run()
+        age_source(cache_dir, 24 + drift)
+        pipeline.run()
+        expect(pipeline.ran, ['upload'], f'ertesi gün ({drift:+d} saat kayma)')
+
+        # İki gün sonra: yeni çalışma
+        age_source(cache_dir, 48 + drift)
+        pipeline.fail_upload = False
+        pipeline.run()
+        expect(pipeline.ran, ['find', 'script', 'render', 'upload'], f'iki gün sonra ({drift:+d} saat kayma)')
+
+def check():
+    for scenario in (check_no_upload_sequence, check_attempt_limit, check_stale_source, check_daily_schedule):
+        cache_dir = tempfile.mkdtemp(prefix='check_stage_graph_')
+        try:
+            scenario(cache_dir)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        print(f"✅ {scenario.__name__}")
+
+if __name__ == '__main__':
+    check()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Render + yükleme örtüşmesini ölçer: önce render sonra yükleme (sıralı) ile
+parçalı MP4'ü render sürerken yükleme (akış) karşılaştırılır. Ağ çağrısı
+yapılmaz; sentetik senaryo bench_render.build_fixture ile, yükleme yerel
+sahte sunucuya (fake_upload_server.py, sınırlı bant genişliği) yapılır.
+
+Her iki yolda sunucuya ulaşan baytların final dosyayla aynı olduğu,
+videonun hatasız çözüldüğü ve iki yolun sürelerinin eşit olduğu doğrulanır.
+
+Kullanım: python scripts/check_stream_upload.py [--scenes 8] [--scene-seconds 6] [--bandwidth-mbps 2] [--backend moviepy]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import importlib
+import threading
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+os.environ['SEGMENT_CACHE_ENABLED'] = '0'  # İki render da soğuk olsun (önbellek ikinciyi hızlandırmasın)
+
+import resumable_upload
+import fake_upload_server
+from bench_render import build_fixture
+from ffmpeg_utils import run_ffmpeg
+
+BODY = {'snippet': {'title': 'Akış testi'}, 'status': {'privacyStatus': 'private'}}
+
+def start_server(bandwidth_mbps, out_dir):
+    """Sahte yükleme sunucusunu arka planda başlat, yükleme adresini döndür"""
+    server = fake_upload_server.make_server(port=0, out_dir=out_dir, bandwidth_mbps=bandwidth_mbps)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}{fake_upload_server.UPLOAD_PATH}'
+
+def render(editor, script, work_dir, output_path, backend, fragmented=False):
+    editor.render_video(script, os.path.join(work_dir, 'thumb.jpg'), output_path, work_dir,
+                        backend=backend, fragmented=fragmented)
+
+def run_sequential(editor, script, work_dir, backend):
+    output_path = os.path.join(work_dir, 'sequential.mp4')
+    started = time.perf_counter()
+    render(editor, script, work_dir, output_path, backend)
+    rendered = time.perf_counter() - started
+    resource = resumable_upload.upload_file(resumable_upload.new_session(), output_path, BODY)
+    return output_path, resource, rendered, time.perf_counter() - started
+
+def run_streaming(editor, script, work_dir, backend):
+    output_path = os.path.join(work_dir, 'streaming.mp4')
+    done, abort = threading.Event(), threading.Event()
+    result = {}
+
+    def upload():
+        try:
+            result['resource'] = resumable_upload.upload_stream(
+                resumable_upload.new_session(), output_path, BODY, done, abort
+            )
+        except Exception as e:
+            result['error'] = e
+
+    started = time.perf_counter()
+    uploader = threading.Thread(target=upload)
+    uploader.start()
+    try:
+        render(editor, script, work_dir, output_path, backend, fragmented=True)
+    except BaseException:
+        abort.set()
+        raise
+    finally:
+        done.set()
+    rendered = time.perf_counter() - started
+    uploader.join()
+
+    if 'error' in result:
+        raise result['error']
+    return output_path, result['resource'], rendered, time.perf_counter() - started
+
+def stream_end(path, stream):
+    """Akışın son paketinin bitiş zamanı (container başlığındaki süre değil, paket zaman damgaları)"""
+    proc = run_ffmpeg(['-i', path, '-map', f'0:{stream}', '-c', 'copy', '-f', 'framemd5', '-'])
+    lines = proc.stdout.decode().splitlines()
+    num, den = next(line for line in lines if line.startswith('#tb')).split(':')[1].strip().split('/')
+    end = max(int(fields[2]) + int(fields[3]) for fields in
+              (line.split(',') for line in lines if not line.startswith('#')))
+    return end * int(num) / int(den)
+
+def verify(output_path, resource, upload_dir):
+    """Sunucuya ulaşan baytlar == final dosya ve video hatasız çözülüyor"""
+    with open(output_path, 'rb') as f:
+        local = f.read()
+    with open(os.path.join(upload_dir, f"{resource['id']}.mp4"), 'rb') as f:
+        uploaded = f.read()
+    if local != uploaded:
+        raise AssertionError(f"Yüklenen baytlar farklı: {len(uploaded)} != {len(local)}")
+
+    run_ffmpeg(['-xerror', '-i', output_path, '-f', 'null', '-'])
+    return len(local), max(stream_end(output_path, 'v'), stream_end(output_path, 'a'))
+
+def check(scenes, scene_seconds, bandwidth_mbps, backend):
+    work_dir = tempfile.mkdtemp(prefix='check_stream_upload_')
+    cwd = os.getcwd()
+    try:
+        os.chdir(work_dir)  # Segment önbelleği (data/cache) geçici klasörde kalır
+        build_fixture(work_dir, scenes, scene_seconds)
+        upload_dir = os.path.join(work_dir, 'uploads')
+        server, resumable_upload.UPLOAD_URL = start_server(bandwidth_mbps, upload_dir)
+
+        editor = importlib.import_module('5_edit_video')
+        with open(os.path.join(work_dir, 'script.json'), 'r', encoding='utf-8') as f:
+            script = json.load(f)
+
+        results = {}
+        for name, run in (('sıralı', run_sequential), ('akış', run_streaming)):
+            output_path, resource, rendered, wall = run(editor, script, work_dir, backend)
+            size, duration = verify(output_path, resource, upload_dir)
+            results[name] = {'render': rendered, 'wall': wall, 'size_mb': size / (1024 * 1024), 'duration': duration}
+        server.shutdown()
+
+        # Parçalı MP4 aynı zaman çizelgesini taşımalı (bir kare tolerans)
+        drift = abs(results['akış']['duration'] - results['sıralı']['duration'])
+        if drift > 1 / editor.FPS:
+            raise AssertionError(f"Akış çıktısının süresi farklı: {drift:.3f}s")
+        return results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render sürerken yüklemeyi sıralı yüklemeyle karşılaştır')
+    parser.add_argument('--scenes', type=int, default=8, help='Sahne sayısı')
+    parser.add_argument('--scene-seconds', type=float, default=6, help='Sahne başına ses süresi')
+    parser.add_argument('--bandwidth-mbps', type=float, default=2, help='Sahte sunucunun yükleme hızı (Mbit/s)')
+    parser.add_argument('--backend', choices=['moviepy', 'ffmpeg'], default='moviepy', help='Render motoru')
+    args = parser.parse_args()
+
+    results = check(args.scenes, args.scene_seconds, args.bandwidth_mbps, args.backend)
+
+    print(f"\n{'Yol':<8} {'render':>8} {'toplam':>8} {'boyut':>8} {'süre':>7}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['render']:7.1f}s {r['wall']:7.1f}s {r['size_mb']:6.1f}MB {r['duration']:6.2f}s")
+    saved = results['sıralı']['wall'] - results['akış']['wall']
+    print(f"\n⏱️ Örtüşme kazancı: {saved:.1f}s ({saved / results['sıralı']['wall'] * 100:.0f}%)")
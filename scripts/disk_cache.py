@@ -0,0 +1,117 @@
+"""
+İçerik adresli, boyut sınırlı disk önbelleği (LRU tahliye).
+
+Girdiler anahtarın SHA-256 özetiyle adlandırılır; erişilen dosyanın mtime'ı
+güncellenir ve toplam boyut sınırı aşılınca en eski erişilenler silinir.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+
+def content_key(*parts):
+    """JSON'a çevrilebilir parçalardan kararlı bir SHA-256 anahtarı üret"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class DiskLRUCache:
+    """`directory` altında en fazla `max_bytes` tutan LRU önbellek"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+
+    def path_for(self, key, suffix=''):
+        return os.path.join(self.directory, key[:2], f'{key}{suffix}')
+
+    def get(self, key, suffix=''):
+        """Girdinin yolunu döndür (yoksa None) ve LRU için erişim zamanını güncelle"""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_json(self, key):
+        path = self.get(key, '.json')
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put_bytes(self, key, data, suffix=''):
+        """Veriyi atomik olarak yaz ve gerekirse tahliye et"""
+        path = self.path_for(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+        return path
+
+    def put_json(self, key, value):
+        return self.put_bytes(key, json.dumps(value, ensure_ascii=False).encode('utf-8'), '.json')
+
+    def put_file(self, key, src_path, suffix=''):
+        """Mevcut bir dosyayı önbelleğe kopyala"""
+        path = self.path_for(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(src_path, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+        return path
+
+    def evict(self):
+        """Toplam boyut sınırı aşıldıysa en eski erişilen girdileri sil"""
+        with self._lock:
+            entries = []
+            total = 0
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith('.tmp'):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,142 @@
+"""
+Encoder profilleri: sabit slayt içeriği için x264 ayarları.
+
+Profiller `tune=stillimage`, uzun GOP ve sabit segmentler için düşük kare
+hızı (VFR) kullanır. `auto` modu çekirdek sayısına ve render süre bütçesine
+göre preset seçer; ölçülen encode hızları data/cache/encoder_stats.json'da
+preset + çözünürlük + fps başına tutulur (önizleme render'ları final
+tahminini şişirmesin) ve sonraki tahminlerde kullanılır.
+"""
+
+import os
+import json
+import math
+import tempfile
+
+# Konfigürasyon
+ENCODER_PROFILE = os.getenv('ENCODER_PROFILE', 'standard')  # draft | standard | archive | auto
+RENDER_TIME_BUDGET = float(os.getenv('RENDER_TIME_BUDGET', '60'))  # auto: encode için hedef süre (sn)
+STATS_PATH = 'data/cache/encoder_stats.json'
+DEFAULT_SIZE = (1080, 1920)
+
+# still_fps: sabit segmentin kare hızı (None = video fps, yani CFR)
+# keyint_seconds: en uzun GOP (None = segment başına tek GOP)
+PROFILES = {
+    'draft': {'preset': 'ultrafast', 'crf': 30, 'tune': 'stillimage', 'still_fps': 1, 'keyint_seconds': None},
+    'standard': {'preset': 'medium', 'crf': 23, 'tune': 'stillimage', 'still_fps': 5, 'keyint_seconds': 10},
+    'archive': {'preset': 'slow', 'crf': 18, 'tune': 'stillimage', 'still_fps': None, 'keyint_seconds': 5},
+}
+
+# Hızlıdan yavaşa; auto bütçeye sığan en yavaş (en verimli) preset'i seçer
+PRESETS = ('ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow')
+
+# 1080x1920 sabit slayt, stillimage: çekirdek başına yaklaşık encode hızı (kare/sn).
+# Ölçüm yoksa piksel sayısına göre ölçeklenerek kullanılır.
+DEFAULT_FPS_PER_CORE = {
+    'ultrafast': 90, 'superfast': 60, 'veryfast': 40, 'faster': 25,
+    'fast': 18, 'medium': 12, 'slow': 6,
+}
+
+def load_stats():
+    try:
+        with open(STATS_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def stats_key(preset, size, fps):
+    """Ölçüm anahtarı: ör. 'medium@1080x1920@30'"""
+    width, height = size
+    return f'{preset}@{width}x{height}@{fps}'
+
+def default_fps_per_core(preset, size):
+    """Ölçüm yoksa tahmin: 1080x1920 değeri piksel oranıyla ölçeklenir"""
+    return DEFAULT_FPS_PER_CORE[preset] * (DEFAULT_SIZE[0] * DEFAULT_SIZE[1]) / (size[0] * size[1])
+
+def record_throughput(preset, frames, seconds, cores, size=DEFAULT_SIZE, fps=30):
+    """Ölçülen encode hızını (kare/sn/çekirdek) kaydet; hareketli ortalama. Yazılamazsa render etkilenmez."""
+    if frames <= 0 or seconds <= 0:
+        return
+    measured = frames / seconds / cores
+    stats = load_stats()
+    key = stats_key(preset, size, fps)
+    previous = stats.get(key)
+    stats[key] = round(measured if previous is None else 0.7 * previous + 0.3 * measured, 3)
+
+    stats_dir = os.path.dirname(STATS_PATH)
+    try:
+        os.makedirs(stats_dir, exist_ok=True)
+        # Eşzamanlı process'ler (batch) aynı geçici dosyaya yazmasın
+        fd, tmp_path = tempfile.mkstemp(dir=stats_dir, prefix='encoder_stats.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2)
+            os.replace(tmp_path, STATS_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"⚠️ Encoder ölçümü kaydedilemedi: {e}")
+
+def segment_fps(profile, fps):
+    """Sabit segment kare hızı"""
+    return profile['still_fps'] or fps
+
+def segment_frames(profile, duration, fps):
+    """Segmentteki kare sayısı (VFR'de son kare bir sonraki segmente kadar ekranda kalır)"""
+    return max(1, math.ceil(round(duration * segment_fps(profile, fps), 6)))
+
+def choose_preset(frames, cores, budget, stats=None, size=DEFAULT_SIZE, fps=30):
+    """Tahmini süresi bütçeye sığan en yavaş preset (hiçbiri sığmazsa en hızlısı)"""
+    stats = stats if stats is not None else load_stats()
+    chosen = PRESETS[0]
+    for preset in PRESETS:
+        fps_per_core = stats.get(stats_key(preset, size, fps)) or default_fps_per_core(preset, size)
+        if frames / (fps_per_core * cores) <= budget:
+            chosen = preset
+    return chosen
+
+def resolve(name=None, durations=(), fps=30, cores=None, budget=None, size=DEFAULT_SIZE):
+    """
+    Profil adını ayarlara çevir. `auto`: standard profil + çekirdek sayısı
+    ve bütçeye göre seçilen preset (durations: encode edilecek segment
+    süreleri, size: (genişlik, yükseklik)).
+    """
+    name = name or ENCODER_PROFILE
+    cores = cores or os.cpu_count() or 1
+
+    if name == 'auto':
+        budget = budget or RENDER_TIME_BUDGET
+        profile = dict(PROFILES['standard'], name='auto')
+        frames = sum(segment_frames(profile, duration, fps) for duration in durations)
+        profile['preset'] = choose_preset(frames, cores, budget, size=size, fps=fps)
+        print(f"🎛️ Encoder auto: {cores} çekirdek, {frames} kare, {budget:.0f}s bütçe -> preset={profile['preset']}")
+        return profile
+
+    if name not in PROFILES:
+        raise ValueError(f"Bilinmeyen encoder profili: {name} (seçenekler: {', '.join(PROFILES)}, auto)")
+    return dict(PROFILES[name], name=name)
+
+def x264_args(profile, fps, frames):
+    """Segment için x264 argümanları (GOP segmentin kendi kare hızına göre)"""
+    seg_fps = segment_fps(profile, fps)
+    keyint = frames
+    if profile['keyint_seconds']:
+        keyint = min(frames, max(1, round(profile['keyint_seconds'] * seg_fps)))
+    return [
+        '-c:v', 'libx264', '-preset', profile['preset'], '-tune', profile['tune'],
+        '-crf', profile['crf'], '-g', keyint, '-sc_threshold', 0, '-pix_fmt', 'yuv420p'
+    ]
+
+def moviepy_params(profile, fps):
+    """moviepy write_videofile için (preset, ek ffmpeg parametreleri); moviepy sabit kare hızında yazar"""
+    keyint = round((profile['keyint_seconds'] or 10) * fps)
+    return profile['preset'], [
+        '-tune', profile['tune'], '-crf', str(profile['crf']), '-g', str(keyint), '-sc_threshold', '0'
+    ]
+
+def describe(profile):
+    fps = profile['still_fps'] or 'CFR'
+    gop = f"{profile['keyint_seconds']}s" if profile['keyint_seconds'] else 'segment'
+    return (f"profil={profile['name']} preset={profile['preset']} crf={profile['crf']} "
+            f"tune={profile['tune']} sabit-fps={fps} gop={gop}")
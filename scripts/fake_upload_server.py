@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+YouTube resumable upload protokolünü taklit eden yerel test sunucusu.
+
+  POST /upload/youtube/v3/videos?uploadType=resumable  -> 200 + Location
+  PUT  <Location> (Content-Range: bytes a-b/toplam)    -> 308 + Range veya 200 + video
+  PUT  <Location> (Content-Range: bytes */toplam)      -> durum sorgusu
+
+Toplam boyut `*` olabilir (akış yüklemesi: boyut son parçada bildirilir).
+
+Hata enjeksiyonu ile yükleyicinin yeniden deneme ve devam etme yolları
+denenebilir: --fail-rate ile rastgele 503, --drop-rate ile parçanın bir
+kısmı okunduktan sonra bağlantı koparılır (okunan baytlar saklanır).
+--bandwidth-mbps gövde okumayı yavaşlatarak gerçek ağ hızını taklit eder.
+Tamamlanan yüklemeler --out-dir altına <video_id>.mp4 olarak yazılır.
+
+Kullanım:
+  python scripts/fake_upload_server.py --port 8089 --fail-rate 0.2 --drop-rate 0.1
+  YOUTUBE_UPLOAD_URL=http://127.0.0.1:8089/upload/youtube/v3/videos python scripts/6_upload_to_youtube.py
+"""
+
+import os
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+UPLOAD_PATH = '/upload/youtube/v3/videos'
+SESSION_PREFIX = '/upload/session/'
+_CONTENT_RANGE_RE = re.compile(r'bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)')
+
+class UploadHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _reply(self, status, headers=None, body=None):
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length', 0))
+        if not self.server.bandwidth:
+            return self.rfile.read(length) if length else b''
+
+        # Sınırlı bant genişliği: 64 KB'lık parçalar arasında bekle
+        data = bytearray()
+        while len(data) < length:
+            piece = self.rfile.read(min(64 * 1024, length - len(data)))
+            if not piece:
+                break
+            data += piece
+            time.sleep(len(piece) / self.server.bandwidth)
+        return bytes(data)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path != UPLOAD_PATH or query.get('uploadType') != ['resumable']:
+            return self._reply(404, body={'error': 'not found'})
+
+        metadata = json.loads(self._read_body() or b'{}')
+        size = int(self.headers.get('X-Upload-Content-Length', -1))
+        server = self.server
+        with server.lock:
+            server.counter += 1
+            session_id = f'session{server.counter}'
+            server.sessions[session_id] = {'size': size, 'metadata': metadata, 'data': bytearray(), 'done': None}
+
+        location = f'http://{self.headers.get("Host")}{SESSION_PREFIX}{session_id}'
+        self._reply(200, headers={'Location': location})
+
+    def do_PUT(self):
+        server = self.server
+        session_id = urlparse(self.path).path[len(SESSION_PREFIX):]
+        upload = server.sessions.get(session_id)
+        if not self.path.startswith(SESSION_PREFIX) or upload is None:
+            self._read_body()
+            return self._reply(404, body={'error': 'session not found'})
+
+        match = _CONTENT_RANGE_RE.fullmatch(self.headers.get('Content-Range', ''))
+        if not match:
+            self._read_body()
+            return self._reply(400, body={'error': 'bad Content-Range'})
+
+        start, end, total = match.groups()
+        length = int(self.headers.get('Content-Length', 0))
+
+        if start is not None and random.random() < server.fail_rate:
+            self.rfile.read(length)
+            return self._reply(503, body={'error': 'injected failure'})
+
+        if start is not None and length and random.random() < server.drop_rate:
+            # Parçanın bir kısmını al, sonra bağlantıyı kopar
+            partial = self.rfile.read(random.randint(1, length))
+            with server.lock:
+                if int(start) == len(upload['data']):
+                    upload['data'] += partial
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+
+        data = self._read_body()
+        with server.lock:
+            if start is not None and upload['done'] is None:
+                start = int(start)
+                received = len(upload['data'])
+                if start > received:
+                    return self._reply(400, body={'error': f'expected offset {received}, got {start}'})
+                upload['data'] += data[received - start:]  # Tekrar gönderilen baytlar atlanır
+
+            if upload['done'] is None and total != '*' and len(upload['data']) == int(total):
+                upload['done'] = self._finish(session_id, upload)
+
+        if upload['done'] is not None:
+            return self._reply(200, body=upload['done'])
+
+        headers = {}
+        if upload['data']:
+            headers['Range'] = f"bytes=0-{len(upload['data']) - 1}"
+        self._reply(308, headers=headers)
+
+    def _finish(self, session_id, upload):
+        video_id = f'fake_{session_id}'
+        if self.server.out_dir:
+            os.makedirs(self.server.out_dir, exist_ok=True)
+            with open(os.path.join(self.server.out_dir, f'{video_id}.mp4'), 'wb') as f:
+                f.write(upload['data'])
+        print(f"✅ {video_id}: {len(upload['data'])} bayt alındı")
+        return dict(
+            upload['metadata'],
+            id=video_id,
+            snippet=dict(upload['metadata'].get('snippet', {}), publishedAt=datetime.now(timezone.utc).isoformat())
+        )
+
+def make_server(host='127.0.0.1', port=8089, fail_rate=0.0, drop_rate=0.0, out_dir=None, verbose=False,
+                bandwidth_mbps=0.0):
+    server = ThreadingHTTPServer((host, port), UploadHandler)
+    server.lock = threading.Lock()
+    server.sessions = {}
+    server.counter = 0
+    server.fail_rate = fail_rate
+    server.drop_rate = drop_rate
+    server.out_dir = out_dir
+    server.verbose = verbose
+    server.bandwidth = bandwidth_mbps * 1024 * 1024 / 8  # bayt/sn (0 = sınırsız)
+    return server
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Yerel YouTube resumable upload taklidi')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Parça isteklerinde rastgele 503 oranı')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Parça ortasında bağlantı koparma oranı')
+    parser.add_argument('--out-dir', default='data/fake_uploads', help='Tamamlanan yüklemelerin yazılacağı klasör')
+    parser.add_argument('--bandwidth-mbps', type=float, default=0.0, help='Yükleme hızı sınırı (Mbit/s, 0 = sınırsız)')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.fail_rate, args.drop_rate, args.out_dir, args.verbose,
+                         args.bandwidth_mbps)
+    print(f"🧪 Sahte yükleme sunucusu: http://{args.host}:{args.port}{UPLOAD_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
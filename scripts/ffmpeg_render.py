@@ -0,0 +1,200 @@
+"""
+FFmpeg render motoru: sabit slaytlardan video.
+
+Her slayt kendi video segmentine encode edilir (aynı codec parametreleri,
+her segment IDR ile başlar). Segmentler girdilerinin özetiyle adlandırılıp
+data/cache/segments altında tutulur; değişmeyen sahneler yeniden encode
+edilmez, eksikler paralel ffmpeg process'lerinde encode edilir
+(RENDER_WORKERS, varsayılan çekirdek sayısı; run_batch worker'larında
+çekirdek sayısı / BATCH_WORKERS). x264 ayarları ve sabit
+segmentlerin kare hızı encoder_profiles.py'den gelir; segment süreleri
+concat listesinde açıkça verildiği için VFR segmentler kaymaz. Final MP4
+concat demuxer ile stream copy olarak birleştirilir. Seslendirme adımının
+AAC parçaları varsa ses de stream copy ile eklenir (audio_track.py);
+yoksa tüm zaman çizelgesi için tek seferde karıştırılıp encode edilir.
+Python tarafında kare üretilmez.
+"""
+
+import os
+import time
+import hashlib
+import audio_track
+import encoder_profiles
+from concurrent.futures import ThreadPoolExecutor
+from disk_cache import DiskLRUCache, content_key
+from ffmpeg_utils import FRAGMENTED_MP4, run_ffmpeg
+
+AUDIO_SAMPLE_RATE = audio_track.SAMPLE_RATE
+TIMESCALE = 15360  # Tüm segmentlerde aynı zaman tabanı (stream copy birleştirme için)
+CPU_COUNT = os.cpu_count() or 1
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', '0')) or CPU_COUNT  # Eşzamanlı segment encode (batch: çekirdek / worker)
+
+# Segment önbelleği
+SEGMENT_CACHE_DIR = 'data/cache/segments'
+SEGMENT_CACHE_MAX_MB = float(os.getenv('SEGMENT_CACHE_MAX_MB', '256'))
+SEGMENT_CACHE_ENABLED = os.getenv('SEGMENT_CACHE_ENABLED', '1') == '1'
+
+segment_cache = DiskLRUCache(SEGMENT_CACHE_DIR, SEGMENT_CACHE_MAX_MB * 1024 * 1024)
+
+def segment_key(image, duration, frames, seg_fps, args):
+    """Segment anahtarı: slayt pikselleri + süre + kare sayısı + encoder ayarları"""
+    pixels = hashlib.sha256(image.tobytes()).hexdigest()
+    return content_key(pixels, image.mode, image.size, round(duration, 6), frames, seg_fps, [str(a) for a in args])
+
+def encode_segment(image, frames, seg_fps, args, work_dir, index, threads=0):
+    """Tek slaytı `frames` karelik video segmentine encode et (threads: x264 thread sayısı, 0 = otomatik)"""
+    slide_dir = os.path.join(work_dir, 'slides')
+    os.makedirs(slide_dir, exist_ok=True)
+
+    png_path = os.path.join(slide_dir, f'slide_{index:02d}.png')
+    segment_path = os.path.join(slide_dir, f'segment_{index:02d}.mp4')
+    image.save(png_path, compress_level=1)
+
+    run_ffmpeg([
+        '-loop', '1', '-framerate', seg_fps, '-i', png_path,
+        '-frames:v', frames, *args, '-threads', threads, '-r', seg_fps,
+        '-video_track_timescale', TIMESCALE,
+        segment_path
+    ])
+    os.remove(png_path)
+    return segment_path
+
+def render_segments(slides, fps, work_dir, profile, workers=None):
+    """
+    Her slayt için segment yolu döndür: önbellekte varsa kullan, eksikleri
+    paralel encode et. Çekirdekler işçiler arasında bölünür (x264 -threads).
+    """
+    workers = workers or RENDER_WORKERS
+    paths = [None] * len(slides)
+    missing = []
+
+    for index, (image, duration) in enumerate(slides):
+        # Son segment sabit kare hızında: VFR'de son karenin süresi videoyu uzatırdı
+        seg_profile = profile if index < len(slides) - 1 else dict(profile, still_fps=None)
+        seg_fps = encoder_profiles.segment_fps(seg_profile, fps)
+        frames = encoder_profiles.segment_frames(seg_profile, duration, fps)
+        args = encoder_profiles.x264_args(seg_profile, fps, frames)
+        key = segment_key(image, duration, frames, seg_fps, args)
+
+        cached_path = segment_cache.get(key, '.mp4') if SEGMENT_CACHE_ENABLED else None
+        if cached_path:
+            paths[index] = cached_path
+        else:
+            missing.append((index, key, image, frames, seg_fps, args, duration))
+
+    if len(missing) < len(slides):
+        print(f"💾 Segment önbelleği: {len(slides) - len(missing)}/{len(slides)} sahne yeniden kullanıldı")
+    if not missing:
+        return paths
+
+    pool_size = max(1, min(workers, len(missing)))
+    threads = max(1, CPU_COUNT // pool_size)
+
+    def encode(item):
+        index, key, image, frames, seg_fps, args, _ = item
+        segment_path = encode_segment(image, frames, seg_fps, args, work_dir, index, threads)
+        if SEGMENT_CACHE_ENABLED:
+            segment_path = segment_cache.put_file(key, segment_path, '.mp4')
+        return index, segment_path
+
+    print(f"🎛️ {encoder_profiles.describe(profile)} | {pool_size} işçi x {threads} thread")
+    started = time.time()
+    # Her iş ayrı bir ffmpeg process'i; thread'ler sadece process'leri bekler
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        for index, segment_path in executor.map(encode, missing):
+            paths[index] = segment_path
+    elapsed = time.time() - started
+
+    # Ulaşılan encode hızı (auto modunun sonraki tahminleri için kaydedilir)
+    frames = sum(item[3] for item in missing)
+    seconds = sum(item[6] for item in missing)
+    print(f"🧩 {len(missing)} segment encode edildi: {elapsed:.1f}s, {frames / elapsed:.1f} kare/sn, "
+          f"{seconds / elapsed:.1f}x gerçek zaman")
+    encoder_profiles.record_throughput(profile['preset'], frames, elapsed, CPU_COUNT, slides[0][0].size, fps)
+    return paths
+
+def audio_filter(first_input, starts, total_duration):
+    """Ses girişlerini zaman çizelgesindeki yerlerine kaydırıp tek ize karıştıran filtre"""
+    labels = []
+    chains = []
+    for offset, start in enumerate(starts):
+        label = f'a{offset}'
+        delay = int(round(start * 1000))
+        chains.append(
+            f'[{first_input + offset}:a]aformat=sample_rates={AUDIO_SAMPLE_RATE}:channel_layouts=stereo,'
+            f'adelay={delay}:all=1[{label}]'
+        )
+        labels.append(f'[{label}]')
+
+    if len(labels) > 1:
+        mixed = f"{''.join(labels)}amix=inputs={len(labels)}:normalize=0:duration=longest"
+    else:
+        mixed = f'{labels[0]}anull'
+    chains.append(f'{mixed},apad,atrim=0:{total_duration:.3f}[a]')
+    return chains
+
+def mix_audio(video_args, output_path, total_duration, audio_segments=None, pcm=None, output_args=()):
+    """Video girdisine sesi ekle: girişler tek seferde karıştırılıp AAC'ye encode edilir"""
+    args = list(video_args)
+    maps = ['-map', '0:v', '-c:v', 'copy']
+    filters = []
+    stdin = None
+
+    if pcm:
+        data, sample_rate = pcm
+        args += ['-f', 's16le', '-ar', sample_rate, '-ac', '1', '-i', 'pipe:0']
+        filters += audio_filter(1, [0.0], total_duration)
+        stdin = data
+    elif audio_segments:
+        for path, _ in audio_segments:
+            args += ['-i', path]
+        filters += audio_filter(1, [start for _, start in audio_segments], total_duration)
+
+    if filters:
+        maps += ['-filter_complex', ';'.join(filters), '-map', '[a]', '-c:a', 'aac', '-ar', AUDIO_SAMPLE_RATE]
+
+    args += [*maps, '-t', f'{total_duration:.3f}', *output_args, output_path]
+    run_ffmpeg(args, input=stdin)
+
+def render_slides(slides, output_path, work_dir, fps=30, audio_segments=None, pcm=None, profile=None, aac_segments=None,
+                  fragmented=False):
+    """
+    slides: [(PIL görüntü, süre)] — süreler kare sınırına yuvarlanır
+    aac_segments: [(ADTS AAC dosyası, başlangıç sn)] — stream copy ile eklenir
+    audio_segments: [(ses dosyası, video üzerindeki başlangıç sn)]
+    pcm: (mono s16le bytes, örnekleme hızı) — bellek içi ses, stdin'den verilir
+    profile: encoder profili adı (draft | standard | archive | auto)
+    fragmented: parçalı MP4 yaz (yazılırken yüklenebilir)
+    """
+    started = time.time()
+    slides = [(image, max(1, round(duration * fps)) / fps) for image, duration in slides]
+    total_duration = sum(duration for _, duration in slides)
+
+    profile = encoder_profiles.resolve(profile, [duration for _, duration in slides], fps, size=slides[0][0].size)
+    segments = render_segments(slides, fps, work_dir, profile)
+
+    # Video: segmentler yeniden encode edilmeden art arda eklenir; süreler
+    # açıkça verilir (VFR segmentte son kare bir sonraki segmente kadar kalır)
+    list_path = os.path.join(work_dir, 'segments.ffconcat')
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write('ffconcat version 1.0\n')
+        for path, (_, duration) in zip(segments, slides):
+            f.write(f"file '{os.path.abspath(path)}'\nduration {duration:.6f}\n")
+
+    args = ['-f', 'concat', '-safe', '0', '-i', list_path]
+    output_args = FRAGMENTED_MP4 if fragmented else ()
+    if aac_segments:
+        # Ses: hazır AAC parçaları; çözülmez, yeniden encode edilmez
+        track_path = os.path.join(work_dir, 'audio.ffconcat')
+        audio_track.write_track_list(
+            [path for path, _ in aac_segments], [start for _, start in aac_segments],
+            total_duration, work_dir, track_path
+        )
+        audio_track.mux(args, track_path, output_path, total_duration, output_args)
+        os.remove(track_path)
+    else:
+        mix_audio(args, output_path, total_duration, audio_segments, pcm, output_args)
+    os.remove(list_path)
+
+    print(f"⚡ ffmpeg render: {len(segments)} segment, {total_duration:.1f}s video, {time.time() - started:.1f}s sürede")
+    return output_path
@@ -0,0 +1,62 @@
+"""
+ffmpeg / ffprobe için küçük yardımcılar
+"""
+
+import os
+import re
+import subprocess
+import tempfile
+
+# Konfigürasyon (moviepy ile aynı ortam değişkeni)
+FFMPEG = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+FFPROBE = os.getenv('FFPROBE_BINARY', 'ffprobe')
+
+# Parçalı MP4: her keyframe'de yeni fragment; dosya sadece sona eklenerek
+# yazılır (yazılan baytlar sonradan değişmez). delay_moov: moov ilk
+# fragment'la yazılır, böylece edit list (B-kare gecikmesi, AAC priming)
+# korunur ve A/V zamanlaması normal MP4 ile aynı kalır
+FRAGMENTED_MP4 = ['-movflags', 'frag_keyframe+empty_moov+delay_moov+default_base_moof']
+
+_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+
+def run_ffmpeg(args, input=None):
+    """ffmpeg'i çalıştır (input: stdin'e yazılacak bytes); hata olursa stderr ile RuntimeError fırlat"""
+    cmd = [FFMPEG, '-hide_banner', '-loglevel', 'error', '-y', *[str(a) for a in args]]
+    proc = subprocess.run(cmd, input=input, capture_output=True)
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode('utf-8', 'replace').strip()
+        raise RuntimeError(f"ffmpeg hatası ({proc.returncode}): {stderr[-500:]}")
+    return proc
+
+def probe_duration(path):
+    """Medya dosyasının süresini saniye olarak döndür"""
+    try:
+        proc = subprocess.run(
+            [FFPROBE, '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', path],
+            capture_output=True, text=True
+        )
+        if proc.returncode == 0 and proc.stdout.strip():
+            return float(proc.stdout.strip())
+    except FileNotFoundError:
+        pass  # ffprobe yok: ffmpeg çıktısından oku
+
+    proc = subprocess.run([FFMPEG, '-hide_banner', '-i', path], capture_output=True, text=True)
+    match = _DURATION_RE.search(proc.stderr)
+    if not match:
+        raise RuntimeError(f"Süre okunamadı: {path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def concat_copy(paths, output_path, extra_args=()):
+    """Aynı codec parametrelerine sahip dosyaları yeniden encode etmeden birleştir (concat demuxer)"""
+    fd, list_path = tempfile.mkstemp(suffix='.txt', dir=os.path.dirname(output_path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', list_path, '-c', 'copy', *extra_args, output_path])
+    finally:
+        os.remove(list_path)
+    return output_path
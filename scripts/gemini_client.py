@@ -0,0 +1,217 @@
+"""
+Gemini için ortak yardımcılar: paylaşılan model istemcisi, RPM/TPM hız
+sınırlayıcı (token bucket), 429 geri çekilmesi, JSON yanıt ayrıştırma,
+şema doğrulamalı akış modu ve içerik adresli yanıt önbelleği.
+
+Hız sınırlayıcı process başınadır: aynı anahtarı kullanan N process
+(run_batch worker'ları) GEMINI_PROCESSES=N ile bütçeyi eşit paylaşır.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from disk_cache import DiskLRUCache, content_key
+from json_stream import IncrementalJSONParser, SchemaError, validate
+
+# Konfigürasyon - hesabın Gemini limitlerine göre ayarla
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+GEMINI_RPM = int(os.getenv('GEMINI_RPM', '10'))  # İstek / dakika
+GEMINI_TPM = int(os.getenv('GEMINI_TPM', '4000000'))  # Token / dakika (girdi + çıktı)
+GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '8'))  # Eşzamanlı istek sınırı
+GEMINI_PROCESSES = max(1, int(os.getenv('GEMINI_PROCESSES', '1')))  # RPM/TPM'yi paylaşan process sayısı
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '5'))  # 429 (ResourceExhausted) yeniden denemesi
+BACKOFF_BASE = 2
+BACKOFF_MAX = 60
+
+# Yanıt önbelleği: (prompt, model, generation_config, şema sürümü) -> ayrıştırılmış JSON
+LLM_CACHE_DIR = 'data/cache/llm'
+LLM_CACHE_MAX_MB = float(os.getenv('LLM_CACHE_MAX_MB', '64'))
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', '1') == '1'
+
+# Akış modu: yanıt token token doğrulanır, şemadan sapınca kesilip yeniden denenir
+GEMINI_STREAMING = os.getenv('GEMINI_STREAMING', '1') == '1'
+STREAM_MAX_ATTEMPTS = int(os.getenv('GEMINI_STREAM_MAX_ATTEMPTS', '3'))
+
+response_cache = DiskLRUCache(LLM_CACHE_DIR, LLM_CACHE_MAX_MB * 1024 * 1024)
+
+class TokenBucket:
+    """Thread-safe token bucket: `capacity` kadar birikir, saniyede `rate` dolar"""
+
+    def __init__(self, capacity, rate):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """`amount` token alınana kadar bekle"""
+        amount = min(float(amount), self.capacity)  # Kapasiteden büyük istek sonsuza dek beklemesin
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+class RateLimiter:
+    """Dakikalık istek (RPM) ve token (TPM) limitlerini birlikte uygular"""
+
+    def __init__(self, rpm=GEMINI_RPM / GEMINI_PROCESSES, tpm=GEMINI_TPM / GEMINI_PROCESSES):
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+
+    def acquire(self, estimated_tokens):
+        self.requests.acquire(1)
+        self.tokens.acquire(estimated_tokens)
+
+_default_limiter = None
+_configured = False
+_models = {}
+_lock = threading.Lock()
+
+def get_limiter():
+    """Process genelinde paylaşılan hız sınırlayıcı"""
+    global _default_limiter
+    with _lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter()
+        return _default_limiter
+
+def get_model(model_name, generation_config):
+    """Aynı model + ayar için tek GenerativeModel örneği döndür"""
+    import google.generativeai as genai  # Ağır import: ilk model kullanımında
+
+    global _configured
+    key = (model_name, json.dumps(generation_config, sort_keys=True))
+    with _lock:
+        if not _configured:
+            genai.configure(api_key=GEMINI_API_KEY)  # Process başına bir kez
+            _configured = True
+        model = _models.get(key)
+        if model is None:
+            model = genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+            _models[key] = model
+        return model
+
+def estimate_tokens(prompt, generation_config):
+    """Kaba token tahmini: ~4 karakter/token + maksimum çıktı"""
+    return len(prompt) // 4 + generation_config.get('max_output_tokens', 0)
+
+def backoff_delay(attempt):
+    """Üstel geri çekilme + jitter: [d/2, d], d = min(BACKOFF_MAX, BACKOFF_BASE * 2^attempt)"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def call_with_retry(call, limiter, estimated_tokens):
+    """
+    Hız sınırına uyarak call()'ı çalıştır; sunucu yine de 429 döndürürse
+    (ResourceExhausted) geri çekilip GEMINI_MAX_RETRIES kez yeniden dene.
+    """
+    from google.api_core.exceptions import ResourceExhausted
+
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        limiter.acquire(estimated_tokens)
+        try:
+            return call()
+        except ResourceExhausted as e:
+            if attempt == GEMINI_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f"⏳ Gemini hız limiti (429), {delay:.1f}s sonra tekrar ({attempt + 1}/{GEMINI_MAX_RETRIES}): {e}")
+            time.sleep(delay)
+
+def generate_text(model_name, generation_config, prompt, limiter=None):
+    """Hız sınırına uyarak modeli çağır ve yanıt metnini döndür"""
+    limiter = limiter or get_limiter()
+    model = get_model(model_name, generation_config)
+    response = call_with_retry(lambda: model.generate_content(prompt), limiter,
+                               estimate_tokens(prompt, generation_config))
+    return response.text
+
+def parse_json_response(response_text):
+    """Markdown kod bloğunu temizle ve JSON olarak ayrıştır"""
+    response_text = response_text.strip()
+
+    # Markdown kod bloğu varsa temizle
+    if response_text.startswith('```json'):
+        response_text = response_text.replace('```json', '').replace('```', '').strip()
+    elif response_text.startswith('```'):
+        response_text = response_text.replace('```', '').strip()
+
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON parse hatası: {e}")
+        print(f"Response: {response_text[:200]}")
+        raise
+
+def stream_json(model_name, generation_config, prompt, schema, on_item=None, limiter=None):
+    """
+    Yanıtı stream=True ile al ve parçalar geldikçe şemaya göre doğrula.
+    Çıktı şemadan saptığı anda akış bırakılır ve istek yeniden denenir.
+    `on_item(key, index, item)` tamamlanan dizi elemanlarını (ör. sahneler)
+    belge bitmeden alır; yeniden denemede aynı index'ler tekrar gelebilir.
+    """
+    limiter = limiter or get_limiter()
+    model = get_model(model_name, generation_config)
+
+    def consume():
+        # 429 akışın ortasında da gelebilir: her denemede ayrıştırıcı sıfırdan başlar
+        parser = IncrementalJSONParser(schema, on_item=on_item)
+        for chunk in model.generate_content(prompt, stream=True):
+            parser.feed(chunk.text)
+        return parser.close()
+
+    for attempt in range(1, STREAM_MAX_ATTEMPTS + 1):
+        try:
+            return call_with_retry(consume, limiter, estimate_tokens(prompt, generation_config))
+        except SchemaError as e:
+            print(f"⚠️ Gemini çıktısı şemadan saptı, akış kesildi ({attempt}/{STREAM_MAX_ATTEMPTS}): {e}")
+            if attempt == STREAM_MAX_ATTEMPTS:
+                raise
+
+def generate_json(model_name, generation_config, prompt, schema_version, limiter=None,
+                  schema=None, on_item=None):
+    """
+    JSON yanıtı üret; aynı (prompt, model, config, şema sürümü) için daha önce
+    başarıyla ayrıştırılmış bir yanıt varsa modeli hiç çağırmadan onu döndür.
+    Şema değişince sürümü artırmak eski girdileri geçersiz kılar.
+    `schema` verilirse yanıt doğrulanır ve (GEMINI_STREAMING açıkken) akışla alınır.
+    """
+    key = content_key(prompt, model_name, generation_config, schema_version)
+
+    if LLM_CACHE_ENABLED:
+        cached = response_cache.get_json(key)
+        if cached is not None:
+            print(f"💾 Gemini yanıtı önbellekten alındı ({key[:12]})")
+            if on_item and schema:
+                for item_key in schema.get('items', {}):
+                    for index, item in enumerate(cached.get(item_key, [])):
+                        on_item(item_key, index, item)
+            return cached
+
+    if schema and GEMINI_STREAMING:
+        result = stream_json(model_name, generation_config, prompt, schema, on_item, limiter)
+    else:
+        result = parse_json_response(generate_text(model_name, generation_config, prompt, limiter))
+        if schema:
+            validate(schema, result)
+            if on_item:
+                for item_key in schema.get('items', {}):
+                    for index, item in enumerate(result.get(item_key, [])):
+                        on_item(item_key, index, item)
+
+    if LLM_CACHE_ENABLED:
+        response_cache.put_json(key, result)
+
+    return result
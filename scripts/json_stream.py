@@ -0,0 +1,226 @@
+"""
+Akış halinde gelen LLM çıktısı için artımlı JSON ayrıştırıcı.
+
+Parçalar geldikçe üst seviye anahtarları ve değer türlerini şemaya göre
+doğrular; şemadan sapınca hemen SchemaError fırlatır. Şemada `items` ile
+tanımlanan dizilerin (ör. `scenes`) tamamlanan elemanları, belgenin geri
+kalanı beklenmeden `on_item` ile dışarı verilir.
+
+Üst seviyede şemada olmayan bir alan şemadan sapma sayılır; dizi
+elemanlarında (items) fazladan alanlara izin verilir. Kural akışlı
+ayrıştırıcıda ve tamamlanmış yanıtı doğrulayan validate()'te aynıdır.
+
+Şema biçimi:
+    {
+        'fields': {'title': 'string', 'scenes': 'array', ...},
+        'required': ['title', 'scenes'],
+        'items': {'scenes': {'fields': {...}, 'required': [...]}}
+    }
+"""
+
+import json
+
+_WHITESPACE = ' \t\r\n'
+_FENCE = '```json'
+
+class SchemaError(ValueError):
+    """Çıktı beklenen JSON şemasına uymuyor"""
+
+def json_type(value):
+    """Python değerinin JSON tür adı"""
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, list):
+        return 'array'
+    if isinstance(value, dict):
+        return 'object'
+    return 'null'
+
+def _type_of_first_char(char):
+    if char == '{':
+        return 'object'
+    if char == '[':
+        return 'array'
+    if char == '"':
+        return 'string'
+    if char in 'tf':
+        return 'boolean'
+    if char == 'n':
+        return 'null'
+    return 'number'
+
+def validate(schema, document, where='yanıt', closed=True):
+    """Tamamlanmış bir nesneyi şemaya göre doğrula (closed: şemada olmayan alan hata)"""
+    if not isinstance(document, dict):
+        raise SchemaError(f"{where}: JSON nesnesi bekleniyordu")
+
+    fields = schema.get('fields', {})
+    for key in schema.get('required', []):
+        if key not in document:
+            raise SchemaError(f"{where}: '{key}' alanı eksik")
+
+    for key, value in document.items():
+        expected = fields.get(key)
+        if expected is None and closed:
+            raise SchemaError(f"{where}: beklenmeyen alan: '{key}'")
+        if expected and json_type(value) != expected:
+            raise SchemaError(f"{where}: '{key}' {expected} olmalı, {json_type(value)} geldi")
+
+    for key, item_schema in schema.get('items', {}).items():
+        for index, item in enumerate(document.get(key) or []):
+            validate(item_schema, item, f"{key}[{index}]", closed=False)
+
+class IncrementalJSONParser:
+    """feed() ile parça parça beslenen, şema farkında JSON ayrıştırıcı"""
+
+    def __init__(self, schema, on_item=None):
+        self.schema = schema
+        self.on_item = on_item
+        self.text = ''
+        self.preamble = ''
+        self.start = None  # Belgenin '{' konumu
+        self.end = None  # Belgenin kapanış konumu (+1)
+        self.stack = []  # Açık nesne/dizi çerçeveleri
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+        self.string_is_key = False
+        self.in_scalar = False
+        self.item_counts = {}
+
+    def feed(self, chunk):
+        """Yeni gelen metni işle; şemadan sapma varsa SchemaError fırlat"""
+        for char in chunk:
+            if self.start is None:
+                self._feed_preamble(char)
+            elif self.end is not None:
+                if char not in _WHITESPACE and char != '`':
+                    raise SchemaError("JSON nesnesinden sonra beklenmeyen metin")
+            else:
+                self.text += char
+                self._step(char, len(self.text) - 1)
+
+    def close(self):
+        """Akış bitti: tam belgeyi ayrıştır, doğrula ve döndür"""
+        if self.end is None:
+            raise SchemaError("Yanıt JSON nesnesi tamamlanmadan bitti")
+
+        try:
+            document = json.loads(self.text)
+        except json.JSONDecodeError as e:
+            raise SchemaError(f"Geçersiz JSON: {e}") from e
+
+        validate(self.schema, document)
+        return document
+
+    # --- İç durum makinesi ---
+
+    def _feed_preamble(self, char):
+        """'{' öncesi: sadece boşluk ve ```json çiti kabul edilir"""
+        if char == '{':
+            self.start = 0
+            self.text = char
+            self.stack.append({'kind': 'object', 'expect': 'key_or_end', 'key': None, 'start': 0})
+            return
+
+        self.preamble += char
+        stripped = self.preamble.strip().lower()
+        if stripped and not _FENCE.startswith(stripped) and not (
+                stripped.startswith('```') and char in _WHITESPACE):
+            raise SchemaError("Yanıt bir JSON nesnesi ile başlamıyor")
+
+    def _step(self, char, index):
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif char == '\\':
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+                if self.string_is_key:
+                    self._on_key(json.loads(self.text[self.string_start:index + 1]))
+            return
+
+        if self.in_scalar:
+            if char not in _WHITESPACE and char not in ',}]':
+                return
+            self.in_scalar = False
+
+        if char in _WHITESPACE:
+            return
+
+        frame = self.stack[-1]
+        expect = frame['expect']
+
+        if char == '"' and expect in ('key_or_end', 'key'):
+            self.in_string = True
+            self.string_start = index
+            self.string_is_key = True
+        elif char == ':' and expect == 'colon':
+            frame['expect'] = 'value'
+        elif char == ',' and expect == 'comma_or_end':
+            frame['expect'] = 'key' if frame['kind'] == 'object' else 'value'
+        elif char in '}]' and (expect in ('comma_or_end', 'key_or_end', 'value_or_end')):
+            if (char == '}') != (frame['kind'] == 'object'):
+                raise SchemaError("Geçersiz JSON: eşleşmeyen kapanış")
+            self._on_container_end(self.stack.pop(), index + 1)
+        elif expect in ('value', 'value_or_end'):
+            self._on_value_start(_type_of_first_char(char), index)
+            frame['expect'] = 'comma_or_end'
+            if char in '{[':
+                self.stack.append({
+                    'kind': 'object' if char == '{' else 'array',
+                    'expect': 'key_or_end' if char == '{' else 'value_or_end',
+                    'key': None,
+                    'start': index
+                })
+            elif char == '"':
+                self.in_string = True
+                self.string_start = index
+                self.string_is_key = False
+            else:
+                self.in_scalar = True
+        else:
+            raise SchemaError(f"Geçersiz JSON: beklenmeyen '{char}'")
+
+    def _streamed_array_key(self):
+        """İçinde bulunulan dizi, şemada akışla verilen bir dizi ise anahtarını döndür"""
+        if len(self.stack) == 2 and self.stack[1]['kind'] == 'array':
+            key = self.stack[0]['key']
+            if key in self.schema.get('items', {}):
+                return key
+        return None
+
+    def _on_key(self, key):
+        frame = self.stack[-1]
+        if len(self.stack) == 1 and key not in self.schema.get('fields', {}):
+            raise SchemaError(f"Beklenmeyen alan: '{key}'")
+        frame['key'] = key
+        frame['expect'] = 'colon'
+
+    def _on_value_start(self, value_type, index):
+        if len(self.stack) == 1:
+            key = self.stack[0]['key']
+            expected = self.schema['fields'].get(key)
+            if expected and value_type != expected:
+                raise SchemaError(f"'{key}' {expected} olmalı, {value_type} geliyor")
+        elif self._streamed_array_key() and value_type != 'object':
+            raise SchemaError(f"'{self._streamed_array_key()}' elemanları nesne olmalı")
+
+    def _on_container_end(self, frame, end):
+        if not self.stack:
+            self.end = end
+            return
+
+        key = self._streamed_array_key()
+        if key and frame['kind'] == 'object':
+            index = self.item_counts.get(key, 0)
+            item = json.loads(self.text[frame['start']:end])
+            validate(self.schema['items'][key], item, f"{key}[{index}]", closed=False)
+            self.item_counts[key] = index + 1
+            if self.on_item:
+                self.on_item(key, index, item)
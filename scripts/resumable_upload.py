@@ -0,0 +1,286 @@
+"""
+YouTube resumable upload protokolünün parçalı, çökmeye dayanıklı istemcisi.
+
+Dosya UPLOAD_CHUNK_MB boyutunda parçalarla PUT edilir (256 KiB'nin katı).
+Oturum URI'si ve onaylanan bayt konumu her parçadan sonra
+data/cache/upload_sessions/<anahtar>.json'a yazılır (anahtar: dosya yolu,
+boyutu, değişme zamanı ve metadata; batch'te eşzamanlı yüklemeler
+birbirini ezmez); process çöker veya yeniden
+çalıştırılırsa aynı dosya + metadata için oturum sunucuya sorulur
+(`Content-Range: bytes */boyut` -> 308 + Range) ve kalan kısımdan devam
+edilir. 5xx, 429 ve bağlantı hatalarında üstel geri çekilme + jitter ile
+yeniden denenir; her denemeden önce sunucudaki gerçek konum sorgulanır.
+
+upload_stream hâlâ yazılmakta olan fragmented MP4'ü yazıldıkça gönderir
+(toplam boyut `*`, son parçada bildirilir); render ile yükleme örtüşür.
+
+YOUTUBE_UPLOAD_URL ile yerel bir sunucuya yönlendirilebilir
+(scripts/fake_upload_server.py).
+"""
+
+import os
+import re
+import json
+import time
+import random
+from disk_cache import content_key
+
+# Konfigürasyon
+DEFAULT_UPLOAD_URL = 'https://www.googleapis.com/upload/youtube/v3/videos'
+UPLOAD_URL = os.getenv('YOUTUBE_UPLOAD_URL', DEFAULT_UPLOAD_URL)
+UPLOAD_CHUNK_MB = float(os.getenv('UPLOAD_CHUNK_MB', '8'))
+UPLOAD_MAX_RETRIES = int(os.getenv('UPLOAD_MAX_RETRIES', '10'))
+UPLOAD_SESSION_DIR = 'data/cache/upload_sessions'
+SESSION_MAX_AGE = 6 * 24 * 3600  # Resumable oturumlar yaklaşık bir hafta geçerli
+CHUNK_ALIGN = 256 * 1024  # Son parça hariç parça boyutu bunun katı olmalı
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+BACKOFF_BASE = 1
+BACKOFF_MAX = 64
+HTTP_TIMEOUT = (10, 120)  # (bağlantı, okuma)
+
+_RANGE_RE = re.compile(r'bytes=0-(\d+)')
+
+class RetryableError(Exception):
+    """Geçici hata: geri çekilip sunucudaki konumdan yeniden denenir"""
+
+class SessionExpired(Exception):
+    """Resumable oturum artık geçerli değil (404/410): yeni oturum açılır"""
+
+def new_session(credentials=None):
+    """Yükleme için HTTP oturumu (credentials verilirse OAuth ile yetkilendirilmiş)"""
+    if credentials is None:
+        import requests
+        return requests.Session()
+    from google.auth.transport.requests import AuthorizedSession
+    return AuthorizedSession(credentials)
+
+def chunk_bytes(chunk_mb=None):
+    """Parça boyutu: 256 KiB'nin katına aşağı yuvarlanmış (en az 256 KiB)"""
+    size = int((chunk_mb or UPLOAD_CHUNK_MB) * 1024 * 1024)
+    return max(CHUNK_ALIGN, size // CHUNK_ALIGN * CHUNK_ALIGN)
+
+def backoff_delay(attempt):
+    """Üstel geri çekilme + jitter: [d/2, d], d = min(BACKOFF_MAX, BACKOFF_BASE * 2^attempt)"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def upload_fingerprint(path, body):
+    """Aynı dosya ve aynı metadata için aynı anahtar (oturum yeniden kullanımı)"""
+    stat = os.stat(path)
+    return content_key(os.path.abspath(path), stat.st_size, stat.st_mtime_ns, body, UPLOAD_URL)
+
+def state_path(fingerprint):
+    return os.path.join(UPLOAD_SESSION_DIR, f'{fingerprint}.json')
+
+def load_state(fingerprint):
+    """Kayıtlı oturum (aynı yükleme ve süresi dolmamışsa), yoksa None"""
+    try:
+        with open(state_path(fingerprint), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('fingerprint') != fingerprint or time.time() - state.get('created_at', 0) > SESSION_MAX_AGE:
+        return None
+    return state
+
+def save_state(state):
+    os.makedirs(UPLOAD_SESSION_DIR, exist_ok=True)
+    path = state_path(state['fingerprint'])
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def clear_state(fingerprint):
+    if os.path.exists(state_path(fingerprint)):
+        os.remove(state_path(fingerprint))
+
+def _request(session, method, url, **kwargs):
+    """HTTP isteği; geçici hataları RetryableError'a çevir"""
+    import requests
+
+    try:
+        response = session.request(method, url, timeout=HTTP_TIMEOUT, **kwargs)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise RetryableError(f"bağlantı hatası: {e}") from e
+    if response.status_code in RETRYABLE_STATUS:
+        raise RetryableError(f"HTTP {response.status_code}")
+    return response
+
+def _next_offset(response):
+    """308 yanıtındaki Range başlığından bir sonraki bayt (Range yoksa 0)"""
+    match = _RANGE_RE.match(response.headers.get('Range', ''))
+    return int(match.group(1)) + 1 if match else 0
+
+def start_session(session, body, size, mimetype):
+    """Resumable oturum aç; oturum URI'sini döndür (size None: boyut henüz bilinmiyor)"""
+    headers = {'X-Upload-Content-Type': mimetype}
+    if size is not None:
+        headers['X-Upload-Content-Length'] = str(size)
+    response = _request(
+        session, 'POST', UPLOAD_URL,
+        params={'uploadType': 'resumable', 'part': ','.join(body.keys())},
+        json=body,
+        headers=headers
+    )
+    if response.status_code != 200 or 'Location' not in response.headers:
+        raise RuntimeError(f"Yükleme oturumu açılamadı: HTTP {response.status_code} {response.text[:300]}")
+    return response.headers['Location']
+
+def query_offset(session, session_uri, size=None):
+    """Sunucunun aldığı bayt sayısını sor. Dönüş: (konum, tamamlandıysa kaynak)"""
+    total = size if size is not None else '*'
+    response = _request(session, 'PUT', session_uri, data=b'', headers={'Content-Range': f'bytes */{total}'})
+    if response.status_code in (200, 201):
+        return size, response.json()
+    if response.status_code == 308:
+        return _next_offset(response), None
+    if response.status_code in (404, 410):
+        raise SessionExpired(f"HTTP {response.status_code}")
+    raise RuntimeError(f"Yükleme durumu alınamadı: HTTP {response.status_code} {response.text[:300]}")
+
+def upload_file(session, path, body, mimetype='video/mp4', chunk_mb=None):
+    """
+    Dosyayı parçalar halinde yükle ve oluşturulan kaynağı (video resource)
+    döndür. Yarım kalmış aynı yükleme varsa kaldığı yerden devam eder.
+    """
+    return _upload(session, path, body, mimetype, chunk_bytes(chunk_mb), fingerprint=upload_fingerprint(path, body))
+
+def upload_stream(session, path, body, done, abort=None, mimetype='video/mp4', chunk_mb=None, poll=0.2):
+    """
+    Hâlâ yazılmakta olan dosyayı (fragmented MP4, geriye dönüp yazılmaz)
+    yazıldıkça yükle. Tamamlanan 256 KiB katları `bytes a-b/*` ile
+    gönderilir; toplam boyut yazım bitince (done set edilince) son parçada
+    bildirilir. abort set edilirse yükleme iptal edilir. Oturum diske
+    yazılmaz: yeniden denemeler process içindedir.
+    """
+    return _upload(session, path, body, mimetype, chunk_bytes(chunk_mb), done=done, abort=abort, poll=poll)
+
+def _upload(session, path, body, mimetype, chunk, fingerprint=None, done=None, abort=None, poll=0.2):
+    """upload_file / upload_stream ortak döngüsü (fingerprint: oturumu diske yaz)"""
+    state = load_state(fingerprint) if fingerprint else None
+    verified = False  # offset sunucuyla doğrulandı mı
+
+    if state:
+        print(f"♻️ Yarım kalan yükleme bulundu: {state['offset'] / 1024 / 1024:.1f} MB kayıtlı, sunucuya soruluyor...")
+
+    started = time.time()
+    resumed_from = None
+    attempt = 0
+    f = None
+
+    try:
+        while True:
+            if abort is not None and abort.is_set():
+                raise RuntimeError("Yükleme iptal edildi: dosya yazımı başarısız")
+
+            # Önce bitti mi, sonra boyut: boyut okunduktan sonra biten yazım bir sonraki turda görülür
+            complete = done is None or done.is_set()
+            available = os.path.getsize(path) if os.path.exists(path) else 0
+            size = available if complete else None
+
+            try:
+                if state is None:
+                    state = {
+                        'fingerprint': fingerprint,
+                        'path': os.path.abspath(path),
+                        'size': size,
+                        'session_uri': start_session(session, body, size, mimetype),
+                        'offset': 0,
+                        'created_at': time.time()
+                    }
+                    if fingerprint:
+                        save_state(state)
+                    verified = True
+
+                if not verified:
+                    offset, resource = query_offset(session, state['session_uri'], size)
+                    if resource is not None:
+                        if fingerprint:
+                            clear_state(fingerprint)
+                        return resource
+                    state['offset'] = offset
+                    if fingerprint:
+                        save_state(state)
+                    verified = True
+
+                offset = state['offset']
+                if resumed_from is None:
+                    resumed_from = offset
+                    if offset:
+                        print(f"⏩ {offset / 1024 / 1024:.1f} MB zaten yüklü, kalan kısımdan devam ediliyor")
+
+                if complete:
+                    length = min(chunk, size - offset)
+                    if length <= 0:
+                        verified = False  # Tüm baytlar gitti: toplam boyutla sorgu yüklemeyi tamamlar
+                        continue
+                    total = size
+                else:
+                    # Yazım sürüyor: sadece tam 256 KiB katları gönderilebilir
+                    length = min(chunk, (available - offset) // CHUNK_ALIGN * CHUNK_ALIGN)
+                    if length <= 0:
+                        done.wait(poll)
+                        continue
+                    total = '*'
+
+                if f is None:
+                    f = open(path, 'rb')
+                f.seek(offset)
+                data = f.read(length)
+                end = offset + len(data) - 1
+                verified = False  # Yanıt alınamazsa konum yeniden sorulur
+                response = _request(
+                    session, 'PUT', state['session_uri'], data=data,
+                    headers={'Content-Range': f'bytes {offset}-{end}/{total}'}
+                )
+            except RetryableError as e:
+                if attempt >= UPLOAD_MAX_RETRIES:
+                    raise RuntimeError(f"Yükleme {UPLOAD_MAX_RETRIES} denemeden sonra başarısız: {e}") from e
+                delay = backoff_delay(attempt)
+                attempt += 1
+                print(f"⚠️ {e}, {delay:.1f}s sonra yeniden denenecek ({attempt}/{UPLOAD_MAX_RETRIES})")
+                time.sleep(delay)
+                continue
+            except SessionExpired as e:
+                print(f"⚠️ Yükleme oturumu geçersiz ({e}), yeni oturum açılıyor")
+                if fingerprint:
+                    clear_state(fingerprint)
+                state = None
+                resumed_from = None
+                continue
+
+            if response.status_code in (200, 201):
+                if fingerprint:
+                    clear_state(fingerprint)
+                sent = size - resumed_from
+                elapsed = time.time() - started
+                print(f"⚡ Yükleme: {sent / 1024 / 1024:.1f} MB, {elapsed:.1f}s, "
+                      f"{sent / 1024 / 1024 / max(elapsed, 1e-6):.2f} MB/s")
+                return response.json()
+
+            if response.status_code == 308:
+                state['offset'] = _next_offset(response)
+                if fingerprint:
+                    save_state(state)
+                verified = True
+                attempt = 0
+                elapsed = time.time() - started
+                rate = (state['offset'] - resumed_from) / 1024 / 1024 / max(elapsed, 1e-6)
+                progress = f"{int(state['offset'] * 100 / size)}% " if size else ''
+                total_mb = f"{size / 1024 / 1024:.1f}" if size else '?'
+                print(f"📊 Yüklendi: {progress}({state['offset'] / 1024 / 1024:.1f}/{total_mb} MB, {rate:.2f} MB/s)")
+                continue
+
+            if response.status_code in (404, 410):
+                print(f"⚠️ Yükleme oturumu geçersiz (HTTP {response.status_code}), yeni oturum açılıyor")
+                if fingerprint:
+                    clear_state(fingerprint)
+                state = None
+                resumed_from = None
+                continue
+
+            raise RuntimeError(f"Yükleme hatası: HTTP {response.status_code} {response.text[:300]}")
+    finally:
+        if f is not None:
+            f.close()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Batch modu: en iyi N aday için tüm pipeline'ı paralel çalıştırır.
+
+Her iş kendi çalışma dizininde (data/jobs/<video_id>) çalışır, çıktılar
+data/processed/<video_id> altına yazılır. Analiz, senaryo, TTS, render ve
+yükleme adımları bir process havuzunda işler arasında paralel yürür.
+Worker'lar Gemini RPM/TPM bütçesini (GEMINI_PROCESSES) ve çekirdekleri
+(RENDER_WORKERS) eşit paylaşır.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import multiprocessing
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import asset_fetcher
+from run_pipeline import run_stages
+
+# Konfigürasyon
+JOBS_DIR = 'data/jobs'
+PROCESSED_DIR = 'data/processed'
+BATCH_SIZE = int(os.getenv('BATCH_SIZE', '3'))
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', str(os.cpu_count() or 1)))
+RERANK_POOL = int(os.getenv('BATCH_RERANK_POOL', '0'))  # >0: bu kadar adayı analiz edip virality_score ile yeniden sırala
+
+def job_dirs(video_id):
+    """Bir işin çalışma ve çıktı dizinleri"""
+    return f'{JOBS_DIR}/{video_id}', f'{PROCESSED_DIR}/{video_id}'
+
+def prepare_job(video_data):
+    """İş dizinini oluştur ve selected_video.json'u yaz"""
+    cache_dir, output_dir = job_dirs(video_data['video_id'])
+    os.makedirs(cache_dir, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(f'{cache_dir}/selected_video.json', 'w', encoding='utf-8') as f:
+        json.dump(video_data, f, ensure_ascii=False, indent=2)
+
+    return cache_dir, output_dir
+
+@contextmanager
+def worker_env(workers):
+    """
+    Spawn edilen worker'ların devraldığı ortam: Gemini bütçesi ve (elle
+    ayarlanmadıysa) eşzamanlı segment encode sayısı worker sayısına bölünür;
+    aksi halde her worker çekirdek sayısı kadar ffmpeg başlatırdı.
+    """
+    overrides = {'GEMINI_PROCESSES': str(workers)}
+    if int(os.getenv('RENDER_WORKERS', '0')) <= 0:
+        overrides['RENDER_WORKERS'] = str(max(1, (os.cpu_count() or 1) // workers))
+
+    previous = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def run_job(video_data, upload=True, analysis=None):
+    """Worker process girişi: hatayı yakalar, çıktıyı iş log'una yazar"""
+    video_id = video_data['video_id']
+    cache_dir, output_dir = job_dirs(video_id)
+    started = time.time()
+
+    with open(f'{cache_dir}/job.log', 'w', encoding='utf-8') as log, \
+            redirect_stdout(log), redirect_stderr(log):
+        try:
+            result = run_stages(video_data, cache_dir, output_dir, upload, analysis)
+            result['status'] = 'ok'
+        except Exception as e:
+            print(f"❌ İş başarısız: {e}")
+            result = {'status': 'failed', 'error': f'{type(e).__name__}: {e}'}
+
+    result.update({
+        'video_id': video_id,
+        'title': video_data['title'],
+        'log': f'{cache_dir}/job.log',
+        'seconds': round(time.time() - started, 1)
+    })
+    return result
+
+def rerank_by_virality(candidates, count):
+    """Adayları eşzamanlı analiz et, virality_score'a göre en iyi `count` tanesini (video, analiz) olarak al"""
+    analyzer = importlib.import_module('2_analyze_video')
+
+    results = [r for r in analyzer.analyze_candidates(candidates) if r['analysis'] is not None]
+    selected = results[:count]
+
+    for result in selected:
+        cache_dir, _ = prepare_job(result['video_data'])
+        analyzer.save_analysis(result['video_data'], result['analysis'], cache_dir)
+        print(f"   📊 {result['analysis']['virality_score']}/100 - {result['video_data']['title']}")
+
+    return [(r['video_data'], r['analysis']) for r in selected]
+
+def run_batch(count=BATCH_SIZE, workers=BATCH_WORKERS, upload=True, rerank_pool=RERANK_POOL):
+    """En iyi `count` adayı seç ve pipeline'ı process havuzunda çalıştır"""
+    if workers < 1:
+        raise ValueError(f"Worker sayısı en az 1 olmalı: {workers}")
+    finder = importlib.import_module('1_find_viral_videos')
+
+    if rerank_pool > count:
+        jobs = rerank_by_virality(finder.find_viral_candidates(top_n=rerank_pool), count)
+    else:
+        jobs = [(video_data, None) for video_data in finder.find_viral_candidates(top_n=count)]
+    if not jobs:
+        return []
+
+    # Thumbnail'ler ana process'te arka planda indirilir (paylaşılan önbellek)
+    asset_fetcher.prefetch_thumbnails([video_data for video_data, _ in jobs])
+
+    print(f"\n🏭 Batch: {len(jobs)} aday, {min(workers, len(jobs))} worker")
+    for video_data, _ in jobs:
+        prepare_job(video_data)
+        print(f"   • {video_data['video_id']} - {video_data['title']}")
+
+    results = []
+    started = time.time()
+
+    # spawn: ana process'teki thread/bağlantı durumları worker'lara kopyalanmasın
+    context = multiprocessing.get_context('spawn')
+    workers = min(workers, len(jobs))
+    with worker_env(workers), ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [executor.submit(run_job, video_data, upload, analysis) for video_data, analysis in jobs]
+
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['status'] == 'ok':
+                print(f"✅ {result['video_id']} tamamlandı ({result['seconds']}s)")
+            else:
+                print(f"❌ {result['video_id']} başarısız: {result['error']} (log: {result['log']})")
+
+    succeeded = sum(1 for r in results if r['status'] == 'ok')
+    print(f"\n🎉 Batch bitti: {succeeded}/{len(results)} başarılı, {time.time() - started:.1f}s")
+
+    os.makedirs(PROCESSED_DIR, exist_ok=True)
+    with open(f'{PROCESSED_DIR}/batch_result.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='En iyi N aday için pipeline\'ı paralel çalıştır')
+    parser.add_argument('--count', type=int, default=BATCH_SIZE, help='İşlenecek aday sayısı')
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help='Paralel worker process sayısı')
+    parser.add_argument('--no-upload', action='store_true', help='YouTube yüklemesini atla')
+    parser.add_argument('--rerank-pool', type=int, default=RERANK_POOL,
+                        help='Bu kadar adayı Gemini ile analiz edip virality_score ile yeniden sırala')
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error(f"--workers en az 1 olmalı (verilen: {args.workers}; BATCH_WORKERS ortam değişkenini de kontrol edin)")
+
+    results = run_batch(args.count, args.workers, upload=not args.no_upload, rerank_pool=args.rerank_pool)
+
+    if not any(r['status'] == 'ok' for r in results):
+        sys.exit(1)
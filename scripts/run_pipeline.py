@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Pipeline'ı (adım 1-6) tek bir Python process'inde çalıştırır.
+
+Modüller ve API istemcileri bir kez yüklenir, adımlar arası veri bellekte
+aktarılır. Hata ayıklama için her adım yine aynı dosyaları yazar
+(selected_video.json, analysis.json, script.json, voiceover.mp3 ...).
+
+Adımlar make gibi çalışır (stage_graph.py): girdileri değişmemiş adımlar
+atlanır, yarım kalan çalışma kaldığı adımdan devam eder. --force ADIM o
+adımı ve sonrakileri yeniden çalıştırır.
+
+STREAM_UPLOAD=1 (veya --stream-upload) ile final video parçalı MP4 olarak
+yazılır ve yükleme render sürerken başlar.
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import argparse
+import importlib
+import threading
+import encoder_profiles
+from concurrent.futures import ThreadPoolExecutor
+from stage_graph import Stage, StageGraph
+
+# Konfigürasyon
+CACHE_DIR = 'data/cache'
+OUTPUT_DIR = 'data/processed'
+STREAM_UPLOAD = os.getenv('STREAM_UPLOAD', '0') == '1'  # Render ile yüklemeyi örtüştür
+
+_upload_client = None
+
+def stage(name):
+    """Adım modülünü yükle (process başına bir kez)"""
+    return importlib.import_module(name)
+
+def get_upload_client():
+    """OAuth ile yetkilendirilmiş yükleme oturumunu bir kez oluştur"""
+    global _upload_client
+    if _upload_client is None:
+        _upload_client = stage('6_upload_to_youtube').get_upload_session()
+    return _upload_client
+
+class StageTimer:
+    """Adım sürelerini ölç ve sonda özetle"""
+
+    def __init__(self):
+        self.timings = []
+
+    def run(self, name, func, *args, **kwargs):
+        print(f"\n{'=' * 20} {name} {'=' * 20}")
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.timings.append((name, time.perf_counter() - started))
+
+    def summary(self):
+        print("\n⏱️  Adım süreleri:")
+        for name, seconds in self.timings:
+            print(f"   {name:<22} {seconds:7.1f}s")
+        print(f"   {'TOPLAM':<22} {sum(s for _, s in self.timings):7.1f}s")
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def voiceover_files(ctx):
+    """Zamanlama manifesti ve gösterdiği sahne ses dosyaları"""
+    path = f"{ctx['cache_dir']}/voiceover_timings.json"
+    try:
+        segments = read_json(path)['segments']
+    except (OSError, ValueError, KeyError):
+        return [path]
+    files = {segment[key] for segment in segments for key in ('path', 'aac_path') if segment.get(key)}
+    return [path, *sorted(files)]
+
+def final_video(ctx):
+    return [stage('5_edit_video').final_output_path(ctx['find'], ctx['output_dir'])]
+
+def render_params(ctx):
+    """Final videoyu etkileyen ayarlar: değişirse render yeniden yapılır"""
+    editor = stage('5_edit_video')
+    return {
+        'backend': editor.RENDER_BACKEND,
+        'profile': encoder_profiles.ENCODER_PROFILE,
+        'size': [editor.WIDTH, editor.HEIGHT],
+        'fps': editor.FPS
+    }
+
+def render_streaming(editor, uploader, script, video_data, cache_dir, output_dir, voiceover):
+    """
+    Adım 5'i akış yüklemesiyle çalıştır: render parçalı MP4 yazarken yükleme
+    thread'i tamamlanan baytları gönderir. (çıktı yolu, yükleme future'ı)
+    döndürür; future adım 6'da beklenir.
+    """
+    output_path = editor.final_output_path(video_data, output_dir)
+    if os.path.exists(output_path):
+        os.remove(output_path)  # Önceki çalışmanın baytları gönderilmesin
+    metadata = editor.video_metadata(script, video_data, output_path)
+    done, abort = threading.Event(), threading.Event()
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    upload_future = executor.submit(
+        uploader.upload_video, get_upload_client(), output_path, metadata, script, output_dir, done=done, abort=abort
+    )
+    executor.shutdown(wait=False)  # Thread yükleme bitince kapanır
+    try:
+        editor.create_final_video(script, video_data, cache_dir, output_dir, voiceover=voiceover, fragmented=True)
+    except BaseException:
+        abort.set()
+        raise
+    finally:
+        done.set()
+    return output_path, upload_future
+
+def prune_videos(output_dir):
+    """Yeni çalışma: önceki çalışmaların final/önizleme videolarını sil (CI önbelleği büyümesin)"""
+    for path in glob.glob(f'{output_dir}/final_video_*.mp4') + glob.glob(f'{output_dir}/preview_*.mp4'):
+        os.remove(path)
+
+def run_find(ctx):
+    prune_videos(ctx['output_dir'])
+    return stage('1_find_viral_videos').find_viral_shorts()
+
+def run_analyze(ctx):
+    return stage('2_analyze_video').analyze_with_gemini(ctx['find'], ctx['cache_dir'])
+
+def run_script(ctx):
+    # Azure bağlantılarını aç; sahneler akışla geldikçe sentezlenmeye başlar
+    voiceover = stage('4_create_voiceover')
+    voiceover.prewarm_azure()
+    analysis_data = {'video_data': ctx['find'], 'analysis': ctx['analyze']}
+    return stage('3_generate_script').generate_script_with_gemini(
+        analysis_data, ctx['cache_dir'], on_scene=voiceover.prefetch_scene_pcm
+    )
+
+def run_voiceover(ctx):
+    return stage('4_create_voiceover').create_voiceover_in_memory(ctx['script'], ctx['cache_dir'])
+
+def run_render(ctx):
+    editor = stage('5_edit_video')
+    script, video_data, voiceover = ctx['script'], ctx['find'], ctx['voiceover']
+    if ctx['preview']:
+        editor.create_preview(script, video_data, ctx['cache_dir'], ctx['output_dir'], voiceover)
+
+    if ctx['upload'] and ctx['stream_upload']:
+        output_path, ctx['streamed_upload'] = render_streaming(
+            editor, stage('6_upload_to_youtube'), script, video_data, ctx['cache_dir'], ctx['output_dir'], voiceover
+        )
+        return output_path
+
+    return editor.create_final_video(script, video_data, ctx['cache_dir'], ctx['output_dir'], voiceover=voiceover)
+
+def run_upload(ctx):
+    streamed = ctx.pop('streamed_upload', None)
+    if streamed is not None:
+        try:
+            return streamed.result()
+        except Exception as e:
+            print(f"⚠️ Akış yüklemesi başarısız ({e}), dosya baştan yükleniyor")
+
+    editor = stage('5_edit_video')
+    metadata = editor.video_metadata(ctx['script'], ctx['find'], ctx['render'])
+    return stage('6_upload_to_youtube').upload_video(
+        get_upload_client(), ctx['render'], metadata, ctx['script'], ctx['output_dir']
+    )
+
+# Adımlar ve okudukları/yazdıkları dosyalar (stage_graph.py)
+STAGES = [
+    Stage('find', '1 - Viral Video Bul', run_find, source=True,
+          outputs=['{cache_dir}/selected_video.json'],
+          load=lambda ctx: read_json(f"{ctx['cache_dir']}/selected_video.json")),
+    Stage('analyze', '2 - Analiz', run_analyze,
+          inputs=['{cache_dir}/selected_video.json'],
+          outputs=['{cache_dir}/analysis.json'],
+          load=lambda ctx: read_json(f"{ctx['cache_dir']}/analysis.json")['analysis']),
+    Stage('script', '3 - Senaryo', run_script,
+          inputs=['{cache_dir}/analysis.json'],
+          outputs=['{cache_dir}/script.json'],
+          load=lambda ctx: read_json(f"{ctx['cache_dir']}/script.json")),
+    # Atlanırsa bellek içi PCM yok: render sesi zamanlama manifestinden okur
+    Stage('voiceover', '4 - Seslendirme', run_voiceover,
+          inputs=['{cache_dir}/script.json'],
+          outputs=[voiceover_files]),
+    Stage('render', '5 - Montaj', run_render,
+          inputs=['{cache_dir}/selected_video.json', '{cache_dir}/script.json', voiceover_files],
+          outputs=['{output_dir}/video_metadata.json', final_video],
+          params=render_params,
+          load=lambda ctx: final_video(ctx)[0]),
+    Stage('upload', '6 - Yükleme', run_upload,
+          inputs=['{cache_dir}/script.json', '{output_dir}/video_metadata.json', final_video],
+          outputs=['{output_dir}/upload_result.json'],
+          load=lambda ctx: read_json(f"{ctx['output_dir']}/upload_result.json")),
+]
+STAGE_NAMES = [s.name for s in STAGES]
+
+def run_stages(video_data=None, cache_dir=CACHE_DIR, output_dir=OUTPUT_DIR, upload=True, analysis=None, timer=None, preview=False,
+               stream_upload=STREAM_UPLOAD, force=()):
+    """
+    Adımları stage_graph ile çalıştır: çıktıları güncel olan adımlar atlanır
+    (ör. başarısız bir yüklemeyi tekrar denemek sadece adım 6'yı çalıştırır).
+    video_data / analysis verilirse adım 1 / 2 yerine kullanılır; preview:
+    final render'dan önce hızlı önizleme; stream_upload: render ve yüklemeyi
+    örtüştür; force: bu adımları ve sonrakileri yeniden çalıştır.
+    Uygun video yoksa None döndürür.
+    """
+    provided = {}
+    if video_data is not None:
+        provided['find'] = video_data
+    if analysis is not None:
+        provided['analyze'] = analysis
+
+    ctx = {
+        'cache_dir': cache_dir, 'output_dir': output_dir,
+        'upload': upload, 'preview': preview, 'stream_upload': stream_upload
+    }
+    graph = StageGraph(STAGES, cache_dir)
+    ctx = graph.run(ctx, force=force, target=None if upload else 'render', provided=provided, timer=timer or StageTimer())
+    if ctx is None:
+        return None
+
+    result = {'output_path': ctx['render']}
+    if upload:
+        result['url'] = ctx['upload']['url']
+    return result
+
+def run_pipeline(upload=True, preview=False, stream_upload=STREAM_UPLOAD, force=()):
+    """Viral videoyu bul ve tüm adımları tek process'te çalıştır (yarım kalan çalışmaya devam eder)"""
+    timer = StageTimer()
+    result = run_stages(upload=upload, timer=timer, preview=preview, stream_upload=stream_upload, force=force)
+    timer.summary()
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pipeline\'ı tek process\'te çalıştır')
+    parser.add_argument('--no-upload', action='store_true', help='YouTube yüklemesini atla')
+    parser.add_argument('--preview', action='store_true', help='Final render\'dan önce düşük çözünürlüklü önizleme üret')
+    parser.add_argument('--stream-upload', action='store_true', default=STREAM_UPLOAD,
+                        help='Final videoyu render sürerken yükle (parçalı MP4)')
+    parser.add_argument('--force', action='append', default=[], choices=STAGE_NAMES, metavar='ADIM',
+                        help=f'Bu adımı ve sonrakileri güncel olsa da yeniden çalıştır ({", ".join(STAGE_NAMES)})')
+    args = parser.parse_args()
+
+    try:
+        result = run_pipeline(upload=not args.no_upload, preview=args.preview, stream_upload=args.stream_upload,
+                              force=args.force)
+    except Exception as e:
+        print(f"\n❌ Pipeline hatası: {e}")
+        sys.exit(1)
+
+    if result is None:
+        print("\nℹ️ Uygun video bulunamadı, pipeline atlandı")
+    else:
+        print(f"\n🎉 Tüm işlem tamamlandı: {result.get('url', result['output_path'])}")
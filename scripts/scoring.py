@@ -0,0 +1,99 @@
+"""
+Aday videoları NumPy dizileri üzerinde toplu (vektörel) puanlar.
+"""
+
+import os
+import re
+from datetime import datetime
+
+# Konfigürasyon (.env ile ayarlanabilir)
+MIN_VIEW_COUNT = int(os.getenv('MIN_VIEW_COUNT', '50000'))
+MIN_ENGAGEMENT_RATE = float(os.getenv('MIN_ENGAGEMENT_RATE', '1.5'))
+SHORTS_MAX_SECONDS = float(os.getenv('SHORTS_MAX_SECONDS', '60'))
+RANK_BY = os.getenv('RANK_BY', 'engagement')  # engagement | velocity
+
+# ISO 8601 süre: P[nW][nD][T[nH][nM][nS]] (YouTube: PT1M30S, PT45S, P0D, P1DT2H...)
+_DURATION_RE = re.compile(
+    r'^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?'
+    r'(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$'
+)
+_DURATION_UNITS = {'weeks': 604800, 'days': 86400, 'hours': 3600, 'minutes': 60, 'seconds': 1}
+
+def parse_iso8601_duration(duration):
+    """ISO 8601 süresini saniyeye çevir; geçersizse None"""
+    match = _DURATION_RE.match(duration or '')
+    if not match or duration in ('P', 'PT') or duration.endswith('T'):
+        return None
+    return sum(float(value) * _DURATION_UNITS[unit] for unit, value in match.groupdict().items() if value)
+
+def is_short_duration(duration):
+    """Shorts: süre 0 < s <= SHORTS_MAX_SECONDS"""
+    seconds = parse_iso8601_duration(duration)
+    return seconds is not None and 0 < seconds <= SHORTS_MAX_SECONDS
+
+def score_candidates(candidates, k=1, min_views=None, min_engagement=None, rank_by=None, now=None):
+    """
+    Aday listesini sütunlara çevirip eşikleri uygular, engagement ve
+    velocity (yayından bu yana saatlik izlenme) hesaplar ve en iyi k adayı
+    kısmi seçimle (partition) döndürür. Sonuç, tüm listeyi birincil anahtar
+    ve izlenmeye göre sıralamakla aynıdır.
+    """
+    import numpy as np  # Ağır import: sadece puanlama sırasında
+
+    if min_views is None:
+        min_views = MIN_VIEW_COUNT
+    if min_engagement is None:
+        min_engagement = MIN_ENGAGEMENT_RATE
+    rank_by = rank_by or RANK_BY
+    now = np.datetime64(now or datetime.utcnow(), 's')
+
+    if not candidates or k <= 0:
+        return []
+
+    # Sütunlar
+    views = np.fromiter((c['view_count'] for c in candidates), dtype=np.int64, count=len(candidates))
+    likes = np.fromiter((c['like_count'] for c in candidates), dtype=np.int64, count=len(candidates))
+    comments = np.fromiter((c['comment_count'] for c in candidates), dtype=np.int64, count=len(candidates))
+    durations = np.array(
+        [parse_iso8601_duration(c.get('duration')) for c in candidates], dtype=np.float64
+    )  # None -> nan
+    published = np.array([c['published_at'].rstrip('Z') for c in candidates], dtype='datetime64[s]')
+
+    # Engagement (%) ve velocity (izlenme/saat)
+    engagement = np.divide(
+        (likes + comments) * 100.0, views,
+        out=np.zeros(len(candidates), dtype=np.float64), where=views > 0
+    )
+    age_hours = np.maximum((now - published).astype(np.float64) / 3600.0, 1.0)  # Yeni videolarda patlamayı önle
+    velocity = views / age_hours
+
+    # Eşikler (nan süreler karşılaştırmada otomatik elenir)
+    mask = (
+        (durations > 0) & (durations <= SHORTS_MAX_SECONDS)
+        & (views >= min_views) & (engagement >= min_engagement)
+    )
+    eligible = np.flatnonzero(mask)
+    if eligible.size == 0:
+        return []
+
+    primary = velocity if rank_by == 'velocity' else engagement
+
+    # Kısmi seçim: tüm listeyi sıralamadan k. en iyi birincil değeri bul ve
+    # ona eşit olanların hepsini al (sınırdaki eşitlikleri izlenme belirler)
+    if eligible.size > k:
+        kth = -np.partition(-primary[eligible], k - 1)[k - 1]
+        eligible = eligible[primary[eligible] >= kth]
+
+    # Sadece seçilenleri sırala (birincil anahtar, sonra izlenme)
+    order = np.lexsort((-views[eligible], -primary[eligible]))
+    top = eligible[order[:k]]
+
+    return [
+        dict(
+            candidates[i],
+            engagement_rate=round(float(engagement[i]), 2),
+            views_per_hour=round(float(velocity[i]), 1),
+            duration_seconds=float(durations[i])
+        )
+        for i in top
+    ]
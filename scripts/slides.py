@@ -0,0 +1,160 @@
+"""
+Slayt yerleşimi: her sahne tek bir sabit görüntüdür.
+
+moviepy ve ffmpeg render motorları aynı görüntüleri kullanır, böylece iki
+yolun çıktısı piksel düzeyinde aynı yerleşime sahip olur.
+
+Fontlar boyut başına bir kez yüklenir, kelime genişlikleri ezberlenir ve
+çizilen metin slaytları (metin, stil) anahtarıyla LRU önbellekte tutulur.
+
+Yerleşim ölçüleri 1080 genişliğe göre verilir ve farklı çözünürlüklerde
+(ör. 540x960 önizleme) orantılı ölçeklenir.
+"""
+
+import os
+import math
+from functools import lru_cache
+
+# Video özellikleri (YouTube Shorts)
+WIDTH = 1080
+HEIGHT = 1920
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+SLIDE_CACHE_SIZE = int(os.getenv('SLIDE_CACHE_SIZE', '16'))  # Tam boy slayt ~6 MB
+
+@lru_cache(maxsize=None)
+def load_font(fontsize):
+    """Kalın font (yoksa PIL varsayılanı); boyut başına bir kez diskten okunur"""
+    from PIL import ImageFont
+    try:
+        return ImageFont.truetype(FONT_PATH, fontsize)
+    except OSError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=8192)
+def word_metrics(word, fontsize):
+    """Kelimenin (ilerleme genişliği, mürekkep sol kenarı, mürekkep sağ kenarı)"""
+    font = load_font(fontsize)
+    left, _, right, _ = font.getbbox(word)
+    return font.getlength(word), left, right
+
+def wrap_text(text, fontsize, max_width):
+    """
+    Kelimeleri satırlara böl. Satırın ilerleme genişliği ezberlenmiş kelime
+    ölçüleriyle artımlı tutulur (her kelime bir kez ölçülür); karşılaştırma
+    textbbox ile aynı mürekkep genişliğini kullanır.
+    """
+    space = word_metrics(' ', fontsize)[0]
+    lines = []
+    current_line = []
+    advance = 0.0  # Satırın son kelimeden önceki ilerleme genişliği
+    left = 0
+
+    for word in text.split():
+        word_advance, word_left, word_right = word_metrics(word, fontsize)
+        start = advance + space if current_line else 0.0
+        line_left = left if current_line else word_left
+        if math.ceil(start + word_right - line_left) < max_width:  # textbbox tam piksele yuvarlar
+            current_line.append(word)
+            advance = start + word_advance
+            left = line_left
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+            current_line = [word]
+            advance = word_advance
+            left = word_left
+
+    if current_line:
+        lines.append(' '.join(current_line))
+    return lines
+
+def text_image(text, fontsize=60, color='white', bg_color='black', width=WIDTH, height=HEIGHT):
+    """
+    Ortalanmış, gölgeli metin slaytı. Arka plan saydamsa (alfa < 255)
+    RGBA, değilse RGB. fontsize 1080 genişlik içindir, width ile ölçeklenir.
+    Sonuç önbellekten paylaşılabilir: değiştirmeden önce .copy() alın.
+    """
+    return _text_image(text, fontsize, color, _hashable(bg_color), width, height)
+
+def _hashable(color):
+    return tuple(color) if isinstance(color, list) else color
+
+def scaled(value, width):
+    """1080 genişliğe göre verilen ölçüyü hedef genişliğe ölçekle"""
+    return value if width == WIDTH else max(1, round(value * width / WIDTH))
+
+def is_transparent(color):
+    """(r, g, b, a) rengi saydam mı (a < 255)"""
+    return isinstance(color, tuple) and len(color) == 4 and color[3] < 255
+
+@lru_cache(maxsize=SLIDE_CACHE_SIZE)
+def _text_image(text, fontsize, color, bg_color, width, height):
+    from PIL import Image, ImageDraw
+
+    mode = 'RGBA' if is_transparent(bg_color) else 'RGB'
+    img = Image.new(mode, (width, height), color=bg_color)
+    draw = ImageDraw.Draw(img)
+
+    # Ölçüler (1080 genişlikte: kenar boşluğu 100, satır arası 20, gölge 3)
+    fontsize = scaled(fontsize, width)
+    margin, spacing, shadow = scaled(100, width), scaled(20, width), scaled(3, width)
+    font = load_font(fontsize)
+
+    lines = wrap_text(text, fontsize, width - margin)
+
+    # Metni çiz
+    y_offset = (height - len(lines) * fontsize) // 2
+    for i, line in enumerate(lines):
+        bbox = draw.textbbox((0, 0), line, font=font)
+        text_width = bbox[2] - bbox[0]
+        x = (width - text_width) // 2
+        y = y_offset + i * (fontsize + spacing)
+
+        # Gölge efekti
+        draw.text((x + shadow, y + shadow), line, font=font, fill='black')
+        draw.text((x, y), line, font=font, fill=color)
+
+    return img
+
+def intro_image(script, width=WIDTH, height=HEIGHT):
+    """Hook slaytı"""
+    return text_image(script['hook'], fontsize=70, color='yellow', bg_color='#1a1a1a', width=width, height=height)
+
+def flatten_layers(layers, width=WIDTH, height=HEIGHT):
+    """
+    Sabit katman yığınını bir kez, alfa kanalına saygılı biçimde tek kareye
+    indir. layers: [(PIL görüntü, 'center' veya (x, y))], alttan üste.
+    """
+    from PIL import Image
+
+    canvas = Image.new('RGBA', (width, height), (0, 0, 0, 255))
+    for image, position in layers:
+        layer = image if image.mode == 'RGBA' else image.convert('RGBA')
+        if position == 'center':
+            position = ((width - layer.width) // 2, (height - layer.height) // 2)
+        canvas.alpha_composite(layer, dest=position)
+    return canvas.convert('RGB')
+
+def thumbnail_image(thumbnail_path, width=WIDTH, height=HEIGHT):
+    """Orijinal thumbnail + saydam "Bu video neden viral oldu?" katmanı, tek kare"""
+    from PIL import Image
+
+    thumb = Image.open(thumbnail_path).convert('RGB').resize((width, height), Image.LANCZOS)
+    overlay = text_image("Bu video neden viral oldu?", fontsize=80, color='white',
+                         bg_color=(0, 0, 0, 0), width=width, height=height)
+    return flatten_layers([(thumb, 'center'), (overlay, 'center')], width, height)
+
+def scene_image(scene, width=WIDTH, height=HEIGHT):
+    """Analiz sahnesi slaytı"""
+    return text_image(scene['text'], fontsize=55, color='white', bg_color='#0f0f0f', width=width, height=height)
+
+def build_slides(script, thumbnail_path, durations, thumbnail_duration, width=WIDTH, height=HEIGHT):
+    """Zaman çizelgesi: [(PIL görüntü, süre)] — hook, thumbnail, scenes[1:]"""
+    slides = [
+        (intro_image(script, width, height), durations[0]),
+        (thumbnail_image(thumbnail_path, width, height), thumbnail_duration)
+    ]
+    for scene, duration in zip(script['scenes'][1:], durations[1:]):
+        slides.append((scene_image(scene, width, height), duration))
+    return slides
@@ -0,0 +1,224 @@
+"""
+Make benzeri adım grafiği: her adım okuduğu (inputs) ve yazdığı (outputs)
+dosyaları bildirir. Girdilerin içerik özetleri (SHA-256) adım başarıyla
+bitince manifeste yazılır; çıktıları mevcut ve girdileri değişmemiş adımlar
+atlanır, sonuçları diskten okunur.
+
+Bir adım şu durumlarda yeniden çalışır:
+  - manifestte kaydı yoksa veya çıktılarından biri eksikse
+  - girdilerinden birinin içeriği veya parametreleri değişmişse
+  - kendisi ya da zincirde önceki bir adım zorlanmışsa (force)
+
+Çıktının elle düzenlenmesi (ör. script.json) o adımı yeniden çalıştırmaz,
+sadece o dosyayı okuyan sonraki adımları çalıştırır (make ile aynı).
+
+Kaynak adımlar (source, ör. viral video keşfi) girdisizdir: sadece yarım
+kalmış bir çalışmaya devam edilirken atlanır. İstenen hedef adım (target,
+ör. --no-upload ile render) bittiğinde çalışma tamamlanmış sayılır ve bir
+sonraki çalıştırma kaynaktan başlar. Sürekli başarısız olan bir çalışmaya
+RESUME_MAX_ATTEMPTS denemeden veya kaynağı RESUME_MAX_HOURS saatten eski
+olduktan sonra devam edilmez: yeni çalışma başlar. Varsayılan 36 saat günlük
+cron periyodundan (24 saat) bilerek uzaktır: zamanlayıcı birkaç saat kaysa da
+ertesi günün çalışması yarım kalan çalışmaya bir kez devam eder, ondan
+sonraki gün her zaman yeni video seçer.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from disk_cache import content_key
+
+MANIFEST_NAME = 'stage_manifest.json'
+HASH_CHUNK = 1024 * 1024
+RESUME_MAX_ATTEMPTS = int(os.getenv('RESUME_MAX_ATTEMPTS', '3'))  # Yarım çalışmaya en fazla bu kadar devam et
+RESUME_MAX_HOURS = float(os.getenv('RESUME_MAX_HOURS', '36'))  # Bundan eski kaynağa devam etme (günlük cron: bir kez devam)
+
+def file_digest(path):
+    """Dosya içeriğinin SHA-256 özeti (yoksa None)"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+def expand(specs, ctx):
+    """Yol listesi: '{cache_dir}/x.json' gibi şablonlar ctx ile doldurulur, fonksiyonlar ctx ile çağrılır"""
+    paths = []
+    for spec in specs:
+        if callable(spec):
+            paths.extend(spec(ctx))
+        else:
+            paths.append(spec.format(**ctx))
+    return paths
+
+class Stage:
+    """
+    Tek adım. run(ctx) çalıştırır ve sonucunu döndürür; load(ctx) adım
+    atlandığında aynı sonucu diskten okur. params(ctx): çıktıyı etkileyen
+    ayarlar (değişirse adım yeniden çalışır).
+    """
+
+    def __init__(self, name, label, run, inputs=(), outputs=(), load=None, params=None, source=False):
+        self.name = name
+        self.label = label
+        self.run = run
+        self.inputs = inputs
+        self.outputs = outputs
+        self.load = load or (lambda ctx: None)
+        self.params = params or (lambda ctx: None)
+        self.source = source
+
+class StageGraph:
+    """Sıralı adım zinciri + `{cache_dir}/stage_manifest.json`"""
+
+    def __init__(self, stages, cache_dir):
+        self.stages = list(stages)
+        self.names = [stage.name for stage in self.stages]
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault('stages', {})
+        manifest.setdefault('completed', False)
+        manifest.setdefault('attempts', 0)
+        return manifest
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = f'{self.manifest_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def downstream(self, names):
+        """Verilen adımlar ve zincirde onlardan sonra gelen tüm adımlar"""
+        for name in names:
+            if name not in self.names:
+                raise ValueError(f"Bilinmeyen adım: {name} (adımlar: {', '.join(self.names)})")
+        if not names:
+            return set()
+        first = min(self.names.index(name) for name in names)
+        return set(self.names[first:])
+
+    def stale_reason(self, stage, ctx):
+        """Adımın neden çalışması gerektiği (güncelse None)"""
+        record = self.manifest['stages'].get(stage.name)
+        if record is None:
+            return 'kayıt yok'
+        missing = [path for path in expand(stage.outputs, ctx) if not os.path.exists(path)]
+        if missing:
+            return f'çıktı eksik: {missing[0]}'
+        if record.get('params') != content_key(stage.params(ctx)):
+            return 'ayarlar değişti'
+        inputs = expand(stage.inputs, ctx)
+        if sorted(record.get('inputs', {})) != sorted(inputs):
+            return 'girdi listesi değişti'
+        for path in inputs:
+            if record['inputs'][path] != file_digest(path):
+                return f'girdi değişti: {path}'
+        return None
+
+    def _record(self, stage, ctx, input_digests):
+        missing = [path for path in expand(stage.outputs, ctx) if not os.path.exists(path)]
+        if missing:
+            # Bir sonraki çalıştırmada adım tekrarlanır
+            print(f"⚠️ {stage.label}: çıktı yazılmadı ({missing[0]}), adım güncel sayılmayacak")
+            self.manifest['stages'].pop(stage.name, None)
+        else:
+            self.manifest['stages'][stage.name] = {
+                'inputs': input_digests,
+                'params': content_key(stage.params(ctx)),
+                'finished_at': datetime.now(timezone.utc).isoformat()
+            }
+        self._save_manifest()
+
+    def _give_up_reason(self):
+        """Yarım çalışmaya devam edilmemesi gerekiyorsa nedeni (yoksa None)"""
+        if self.manifest['attempts'] >= RESUME_MAX_ATTEMPTS:
+            return f"{self.manifest['attempts']} devam denemesi başarısız"
+        for stage in self.stages:
+            record = self.manifest['stages'].get(stage.name)
+            if stage.source and record:
+                age = datetime.now(timezone.utc) - datetime.fromisoformat(record['finished_at'])
+                if age.total_seconds() > RESUME_MAX_HOURS * 3600:
+                    return f'kaynak {age.total_seconds() / 3600:.0f} saat önce seçildi'
+        return None
+
+    def _start(self):
+        """Çalışmayı yarım olarak işaretle: bundan sonra çökerse devam edilir"""
+        if self.manifest['completed']:
+            self.manifest['completed'] = False
+            self._save_manifest()
+
+    def run(self, ctx, force=(), target=None, provided=None, timer=None):
+        """
+        Adımları sırayla çalıştır veya atla; sonuçlar ctx[adım adı]'na yazılır.
+        force: zorla yeniden çalıştırılacak adımlar (sonrakiler de çalışır);
+        target: bu adımda dur; provided: {adım: sonuç} dışarıda hesaplanmış
+        sonuçlar (çalıştırılmaz ama kaydedilir). Kaynak adım None döndürürse
+        (işlenecek bir şey yok) None döndürür.
+        """
+        forced = self.downstream(force)
+        provided = provided or {}
+        last = self.names.index(target) if target else len(self.stages) - 1
+        resume = not self.manifest['completed'] or bool(forced)
+
+        if not self.manifest['completed'] and not forced and self.manifest['stages']:
+            reason = self._give_up_reason()
+            if reason:
+                print(f"⚠️ Yarım çalışma bırakıldı ({reason}), yeni çalışma başlıyor")
+                resume = False
+            else:
+                self.manifest['attempts'] += 1
+                self._save_manifest()
+
+        for stage in self.stages[:last + 1]:
+            if stage.name in forced:
+                reason = 'zorlandı'
+            elif stage.source and not resume:
+                reason = 'yeni çalışma'
+            else:
+                reason = self.stale_reason(stage, ctx)
+
+            if reason is None:
+                print(f"\n⏭️  {stage.label}: güncel, atlandı")
+                ctx[stage.name] = stage.load(ctx)
+                continue
+
+            if not stage.source:
+                self._start()
+            # Yarıda kalırsa eski kayıt yarım çıktıyı güncel göstermesin
+            if self.manifest['stages'].pop(stage.name, None) is not None:
+                self._save_manifest()
+
+            input_digests = {path: file_digest(path) for path in expand(stage.inputs, ctx)}
+            if stage.name in provided:
+                ctx[stage.name] = provided[stage.name]
+            else:
+                print(f"\n▶️  {stage.label}: {reason}")
+                if timer:
+                    ctx[stage.name] = timer.run(stage.label, stage.run, ctx)
+                else:
+                    ctx[stage.name] = stage.run(ctx)
+
+            if stage.source:
+                if ctx[stage.name] is None:
+                    return None
+                self._start()
+                self.manifest['attempts'] = 0
+            self._record(stage, ctx, input_digests)
+
+        # Hedef adım bitti: bir sonraki çalıştırma yeni kaynakla başlar
+        self.manifest['completed'] = True
+        self.manifest['attempts'] = 0
+        self._save_manifest()
+        return ctx
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Paketlenmiş discovery dokümanlarını Google'dan yeniden indirir
+"""
+
+import os
+import json
+import requests
+from youtube_client import DISCOVERY_DIR
+
+# Konfigürasyon
+SERVICES = [('youtube', 'v3')]
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/{service}/{version}/rest'
+
+def update_discovery_docs():
+    """Her servis için dokümanı indir ve config/discovery altına yaz"""
+    os.makedirs(DISCOVERY_DIR, exist_ok=True)
+
+    for service, version in SERVICES:
+        response = requests.get(DISCOVERY_URL.format(service=service, version=version), timeout=30)
+        response.raise_for_status()
+        document = response.json()
+
+        path = os.path.join(DISCOVERY_DIR, f'{service}.{version}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, separators=(',', ':'), sort_keys=True)
+
+        print(f"✅ {service} {version} (revision {document.get('revision')}) -> {path}")
+
+if __name__ == '__main__':
+    update_discovery_docs()
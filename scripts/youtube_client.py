@@ -0,0 +1,35 @@
+"""
+YouTube Data API istemcisini paketlenmiş discovery dokümanından çevrimdışı kurar.
+
+config/discovery/youtube.v3.json repo ile birlikte gelir; build() gibi ağdan
+ya da kütüphane içinden doküman aramak yerine build_from_document kullanılır.
+Dokümanı yenilemek için: python scripts/update_discovery_docs.py
+"""
+
+import os
+import json
+from functools import lru_cache
+
+# Konfigürasyon
+DISCOVERY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'discovery')
+
+@lru_cache(maxsize=None)
+def load_discovery_document(service='youtube', version='v3'):
+    """Paketlenmiş discovery dokümanını bir kez okuyup ayrıştır"""
+    path = os.path.join(DISCOVERY_DIR, f'{service}.{version}.json')
+
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # Yedek: google-api-python-client ile gelen statik doküman
+    from googleapiclient.discovery_cache import get_static_doc
+    document = get_static_doc(service, version)
+    if document is None:
+        raise FileNotFoundError(f"Discovery dokümanı bulunamadı: {path}")
+    return json.loads(document)
+
+def build_youtube(**kwargs):
+    """youtube v3 istemcisini ağa çıkmadan oluştur (developerKey / credentials kwargs)"""
+    from googleapiclient.discovery import build_from_document
+    return build_from_document(load_discovery_document('youtube', 'v3'), **kwargs)